@@ -8,6 +8,8 @@ import asyncio
 from dotenv import load_dotenv
 import os
 
+from helper.run_session import run_streaming
+
 load_dotenv()
 
 # root_agent = Agent(
@@ -50,10 +52,12 @@ root_agent = Agent(
 runner = InMemoryRunner(agent=root_agent)
 
 async def debug_check():
-    debug_info = await runner.run_debug("What is the capital of Japan")
+    # Streams the answer as it is generated and reports time to first token;
+    # runner.run_debug() only prints once the whole answer is ready
+    turns = await run_streaming(runner, "What is the capital of Japan")
     # response = runner.run("What is the capital of Japan")
-    return debug_info
+    return turns
 
 if __name__ == "__main__":
     debug_result = asyncio.run(debug_check())
-    print("Debug info result:\n", debug_result)
\ No newline at end of file
+    print("Time to first token:", [turn["ttft_s"] for turn in debug_result])
\ No newline at end of file
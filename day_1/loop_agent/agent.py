@@ -1,7 +1,15 @@
-from google.adk.agents import Agent, LoopAgent, SequentialAgent
+from google.adk.agents import Agent, SequentialAgent
 from google.adk.models.google_llm import Gemini
-from google.adk.tools import FunctionTool
+from google.adk.tools import FunctionTool, ToolContext
 from google.genai import types
+import os
+import sys
+
+# Add repository root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from helper.converging_loop_agent import ConvergingLoopAgent, state_equals
+from helper.instruction_template import compile_instruction
+from helper.speculative_refinement_agent import SpeculativeRefinementAgent
 
 
 # retry configuration for the model
@@ -11,8 +19,11 @@ retry_config = types.HttpRetryOptions(
 
 
 # This is the function that the RefinerAgent will call to exit the loop.
-def exit_loop():
+def exit_loop(tool_context: ToolContext):
     """Call this function ONLY when the critique is 'APPROVED', indicating the story is finished and no more changes are needed."""
+    # Escalating is what actually stops the LoopAgent
+    tool_context.actions.escalate = True
+    tool_context.actions.skip_summarization = True
     return {"status": "approved", "message": "Story approved. Exiting refinement loop."}
 
 
@@ -30,13 +41,13 @@ initial_writer_agent = Agent(
 critic_agent = Agent(
     name="CriticAgent",
     model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
-    instruction="""You are a constructive story critic. Review the story below.
+    instruction=compile_instruction("""You are a constructive story critic. Review the story below.
     story:{initial_story}
 
     Evaluate the story's plot, character, and pacing.
     - If the story is well-written, you must respond with the phrase "APPROVED".
     - Otherwise, provide 2-3 specific, actionable suggestions for improvement.
-    """,
+    """),
     output_key="critique",
 )
 
@@ -44,22 +55,41 @@ critic_agent = Agent(
 refiner_agent = Agent(
     name="RefinerAgent",
     model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
-    instruction=""" You are a story refiner. Your job is to check the values:
+    instruction=compile_instruction(""" You are a story refiner. Your job is to check the values:
     story:{initial_story}
     critique: {critique}
 
     - If the value of critique is exactly 'APPROVED', call the exit_loop function and nothing more,
-    - Otherwise, rewrite the story to fully incorporate the feedback in critique.""",
+    - Otherwise, rewrite the story to fully incorporate the feedback in critique."""),
     output_key="initial_story",
     tools=[FunctionTool(exit_loop)],
 )
 
 
-refinement_loop_agent = LoopAgent(
-    name="refinement_loop_agent",
-    sub_agents=[critic_agent, refiner_agent],
-    max_iterations=2,
-)
+# The loop stops right after the critic approves (no refiner call just to run
+# exit_loop) or once a rewrite barely changes the story.
+#
+# LOOP_MODE=speculative trades tokens for latency instead: each round refines
+# SPECULATIVE_CANDIDATES stories in parallel, scores them all in parallel and
+# keeps the best, never spending more than SPECULATIVE_MAX_MODEL_CALLS calls.
+if os.getenv("LOOP_MODE") == "speculative":
+    refinement_loop_agent = SpeculativeRefinementAgent(
+        name="refinement_loop_agent",
+        sub_agents=[critic_agent, refiner_agent],
+        max_iterations=2,
+        candidates=int(os.getenv("SPECULATIVE_CANDIDATES", "3")),
+        target_score=8,
+        max_model_calls=int(os.getenv("SPECULATIVE_MAX_MODEL_CALLS", 0)) or None,
+    )
+else:
+    refinement_loop_agent = ConvergingLoopAgent(
+        name="refinement_loop_agent",
+        sub_agents=[critic_agent, refiner_agent],
+        max_iterations=2,
+        exit_conditions=[state_equals("critique", "APPROVED")],
+        convergence_key="initial_story",
+        similarity_threshold=float(os.getenv("LOOP_SIMILARITY_THRESHOLD", "0.97")),
+    )
 
 
 root_agent = SequentialAgent(
@@ -5,6 +5,15 @@ from google.adk.runners import InMemoryRunner
 from google.genai import types
 from dotenv import load_dotenv
 import asyncio
+import os
+import sys
+
+# Add repository root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from helper.llm_cache import LlmResponseCache, use_response_cache
+from helper.instruction_template import compile_instruction
+from helper.run_session import run_streaming
+from helper.state_ref_agent_tool import StateRefAgentTool
 
 load_dotenv()
 
@@ -28,11 +37,20 @@ summarizer_agent = Agent(
     name="SummarizerAgent",
     model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
     # The instruction is modified to request a bulleted list for a clear output format.
-    instruction="""Read the provided research findings: {research_findings}
-Create a concise summary as a bulleted list with 3-5 key points.""",
+    instruction=compile_instruction("""Read the provided research findings: {research_findings}
+Create a concise summary as a bulleted list with 3-5 key points."""),
     output_key="final_summary",
 )
 
+# The research findings only travel through session state: ResearchAgent returns
+# a short reference to `research_findings` and SummarizerAgent reads the full
+# text from state, so the findings never enter the coordinator's prompt twice.
+# AGENT_TOOL_RESULTS=inline returns the full findings to the coordinator.
+if os.getenv("AGENT_TOOL_RESULTS") == "inline":
+    research_tool = AgentTool(research_agent)
+else:
+    research_tool = StateRefAgentTool(research_agent)
+
 # Root Coordinator: Orchestrates the workflow by calling the sub-agents as tools.
 root_agent = Agent(
     name="ResearchCoordinator",
@@ -41,18 +59,31 @@ root_agent = Agent(
     instruction="""You are a research coordinator. Your goal is to answer the user's query by orchestrating a workflow.
     1. First, you MUST call the `ResearchAgent` tool to find relevant information on the topic provided by the user.
     2. Next, after receiving the research findings, you MUST call the `SummarizerAgent` tool to create a concise summary.
+       If `ResearchAgent` returned a reference (status "stored"), the summarizer already has the findings:
+       only ask it to summarize them, do not repeat them in the request.
     3. Finally, present the final summary clearly to the user as your response.""",
     # We wrap the sub-agents in `AgentTool` to make them callable tools for the root agent.
-    tools=[AgentTool(research_agent), AgentTool(summarizer_agent)],
+    tools=[research_tool, AgentTool(summarizer_agent)],
 )
 
+# Optional on-disk response cache: LLM_CACHE=record reuses answers to identical
+# prompts, LLM_CACHE=replay fails instead of calling Gemini (for CI).
+if os.getenv("LLM_CACHE"):
+    use_response_cache(
+        root_agent,
+        LlmResponseCache(os.getenv("LLM_CACHE_PATH", "llm_cache.db")),
+        replay_only=os.getenv("LLM_CACHE") == "replay",
+    )
+
 
 runner = InMemoryRunner(agent=root_agent)
 
 
 async def main():
-    await runner.run_debug(
-        "What are the latest advancements in quantum computing and what do they mean for AI?"
+    # Print the coordinator's answer as it streams in, with tool markers
+    await run_streaming(
+        runner,
+        "What are the latest advancements in quantum computing and what do they mean for AI?",
     )
 
 
@@ -1,7 +1,15 @@
-from google.adk.agents import Agent, ParallelAgent, SequentialAgent
+from google.adk.agents import Agent, SequentialAgent
 from google.adk.models.google_llm import Gemini
 from google.adk.tools import google_search
 from google.genai import types
+import os
+import sys
+
+# Add repository root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from helper.deadline_parallel_agent import DeadlineParallelAgent
+from helper.instruction_template import compile_instruction
+from helper.rate_limiter import RateLimiter, use_rate_limiter
 
 
 retry_config = types.HttpRetryOptions(
@@ -44,7 +52,7 @@ aggregator_agent = Agent(
     name="AggregatorAgent",
     model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
     # It uses placeholders to inject the outputs from the parallel agents, which are now in the session state.
-    instruction="""Combine these three research findings into a single executive summary:
+    instruction=compile_instruction("""Combine these three research findings into a single executive summary:
 
     **Technology Trends:**
     {tech_research}
@@ -55,15 +63,20 @@ aggregator_agent = Agent(
     **Finance Innovations:**
     {finance_research}
     
-    Your summary should highlight common themes, surprising connections, and the most important key takeaways from all three reports. The final summary should be around 200 words.""",
+    Your summary should highlight common themes, surprising connections, and the most important key takeaways from all three reports. The final summary should be around 200 words."""),
     output_key="executive_summary",  # This will be the final output of the entire system.
 )
 
 
 # PARALLEL AGENT
-parallel_agent = ParallelAgent(
+# Optional early exit: PARALLEL_BRANCH_TIMEOUT (seconds) drops branches that are
+# still running, PARALLEL_QUORUM (e.g. 2) is the minimum number that must finish.
+# Dropped branches are marked missing in state and the aggregator still runs.
+parallel_agent = DeadlineParallelAgent(
     name="parallelizer",
     sub_agents=[tech_researcher, health_researcher, finance_researcher],
+    branch_timeout=float(os.getenv("PARALLEL_BRANCH_TIMEOUT", 0)) or None,
+    quorum=int(os.getenv("PARALLEL_QUORUM", 0)) or None,
 )
 
 
@@ -72,3 +85,16 @@ root_agent = SequentialAgent(
     name="root_agent",
     sub_agents=[parallel_agent, aggregator_agent],
 )
+
+
+# QUOTA SCHEDULING
+# All branches share one limiter, so calls queue up before they hit the API
+# instead of collecting 429s and sleeping through the retry backoff.
+# e.g. GEMINI_MAX_IN_FLIGHT=4 GEMINI_RPM=15 GEMINI_TPM=250000
+if any(os.getenv(k) for k in ("GEMINI_MAX_IN_FLIGHT", "GEMINI_RPM", "GEMINI_TPM")):
+    rate_limiter = RateLimiter(
+        max_in_flight=int(os.getenv("GEMINI_MAX_IN_FLIGHT", 0)) or None,
+        requests_per_minute=float(os.getenv("GEMINI_RPM", 0)) or None,
+        tokens_per_minute=float(os.getenv("GEMINI_TPM", 0)) or None,
+    )
+    use_rate_limiter(root_agent, rate_limiter)
@@ -0,0 +1,231 @@
+from google.adk.agents import ParallelAgent, SequentialAgent
+from google.adk.runners import InMemoryRunner
+from google.adk.version import __version__ as adk_version
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+# Add repository root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from helper.fake_llm import use_fake_models
+
+# Load the sibling agent.py by path: a plain `import agent` would find the
+# repository root's agent.py whenever this directory is not sys.path[0]
+# (e.g. under `python -m`).
+_agent_spec = importlib.util.spec_from_file_location(
+    "parallelization_agent_agent", os.path.join(os.path.dirname(__file__), "agent.py")
+)
+_agent_module = importlib.util.module_from_spec(_agent_spec)
+_agent_spec.loader.exec_module(_agent_module)
+aggregator_agent = _agent_module.aggregator_agent
+finance_researcher = _agent_module.finance_researcher
+health_researcher = _agent_module.health_researcher
+tech_researcher = _agent_module.tech_researcher
+
+# Fan-out benchmark for the parallelizer pipeline.
+# Every model call is served by FakeGemini with a fixed latency, so the numbers
+# measure how well the branches overlap, not how fast Gemini is.
+#
+# Run:
+#   python3 benchmark.py --branches 3 8 16 32 64 --latency 0.05 0.2 --output report.json
+# Compare against a previous report (exits 1 on a speedup regression):
+#   python3 benchmark.py --compare baseline.json
+
+BRANCH_TEMPLATES = [tech_researcher, health_researcher, finance_researcher]
+
+
+def build_pipeline(num_branches: int, parallel: bool):
+    """Builds the research pipeline with `num_branches` researcher branches."""
+    branches = []
+    for i in range(num_branches):
+        template = BRANCH_TEMPLATES[i % len(BRANCH_TEMPLATES)]
+        branches.append(
+            template.clone(
+                update={
+                    "name": f"{template.name}_{i}",
+                    "output_key": f"{template.output_key}_{i}",
+                }
+            )
+        )
+
+    findings = "\n\n".join(f"{{{branch.output_key}}}" for branch in branches)
+    aggregator = aggregator_agent.clone(
+        update={
+            "instruction": f"""Combine these research findings into a single executive summary:
+
+    {findings}
+
+    Highlight common themes and the most important key takeaways.""",
+        }
+    )
+
+    fan_out_type = ParallelAgent if parallel else SequentialAgent
+    fan_out = fan_out_type(name="parallelizer", sub_agents=branches)
+    return SequentialAgent(name="root_agent", sub_agents=[fan_out, aggregator])
+
+
+async def _monitor_loop_lag(samples: list, stop: asyncio.Event, interval=0.005):
+    # Measures how late the event loop wakes us up compared to the requested sleep
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - start - interval))
+
+
+async def run_once(num_branches: int, latency: float, parallel: bool) -> dict:
+    root_agent = build_pipeline(num_branches, parallel)
+    fakes = use_fake_models(root_agent, latency=latency)
+    runner = InMemoryRunner(agent=root_agent, app_name="parallel_benchmark")
+
+    lag_samples = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(_monitor_loop_lag(lag_samples, stop))
+
+    start = time.perf_counter()
+    await runner.run_debug("Run today's research.", quiet=True)
+    wall_time = time.perf_counter() - start
+
+    stop.set()
+    await monitor
+
+    branch_times = [
+        model.total_latency_s
+        for name, model in fakes.items()
+        if name != aggregator_agent.name
+    ]
+    aggregator_time = fakes[aggregator_agent.name].total_latency_s
+    # The longest chain of model calls that has to happen one after the other
+    critical_path = max(branch_times) + aggregator_time
+    lag_samples.sort()
+
+    return {
+        "wall_time_s": wall_time,
+        "critical_path_s": critical_path,
+        "model_time_s": sum(branch_times) + aggregator_time,
+        "orchestration_overhead_s": wall_time - critical_path
+        if parallel
+        else wall_time - sum(branch_times) - aggregator_time,
+        "loop_lag_max_ms": 1000 * lag_samples[-1] if lag_samples else 0.0,
+        "loop_lag_p99_ms": 1000 * lag_samples[int(0.99 * (len(lag_samples) - 1))]
+        if lag_samples
+        else 0.0,
+    }
+
+
+async def run_benchmark(branch_counts, latencies, repeats: int) -> list[dict]:
+    results = []
+    for num_branches in branch_counts:
+        for latency in latencies:
+            parallel_runs = [
+                await run_once(num_branches, latency, parallel=True)
+                for _ in range(repeats)
+            ]
+            sequential_runs = [
+                await run_once(num_branches, latency, parallel=False)
+                for _ in range(repeats)
+            ]
+            parallel_wall = statistics.median(r["wall_time_s"] for r in parallel_runs)
+            sequential_wall = statistics.median(
+                r["wall_time_s"] for r in sequential_runs
+            )
+            result = {
+                "branches": num_branches,
+                "latency_s": latency,
+                "parallel_wall_time_s": parallel_wall,
+                "sequential_wall_time_s": sequential_wall,
+                "speedup": sequential_wall / parallel_wall,
+                # Best possible speedup if the branches overlap perfectly
+                "ideal_speedup": (num_branches + 1) / 2,
+                "critical_path_s": statistics.median(
+                    r["critical_path_s"] for r in parallel_runs
+                ),
+                "parallel_overhead_s": statistics.median(
+                    r["orchestration_overhead_s"] for r in parallel_runs
+                ),
+                "loop_lag_max_ms": max(r["loop_lag_max_ms"] for r in parallel_runs),
+                "loop_lag_p99_ms": statistics.median(
+                    r["loop_lag_p99_ms"] for r in parallel_runs
+                ),
+            }
+            print(
+                f"branches={num_branches:>3} latency={latency:.3f}s "
+                f"speedup={result['speedup']:.2f}x (ideal {result['ideal_speedup']:.1f}x) "
+                f"critical_path={result['critical_path_s']:.3f}s "
+                f"loop_lag_max={result['loop_lag_max_ms']:.1f}ms"
+            )
+            results.append(result)
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+def compare_reports(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Lists the configurations whose speedup dropped by more than `tolerance`."""
+    baseline_speedups = {
+        (r["branches"], r["latency_s"]): r["speedup"] for r in baseline["results"]
+    }
+    regressions = []
+    for result in current["results"]:
+        previous = baseline_speedups.get((result["branches"], result["latency_s"]))
+        if previous and result["speedup"] < previous * (1 - tolerance):
+            regressions.append(
+                f"branches={result['branches']} latency={result['latency_s']}: "
+                f"speedup {previous:.2f}x -> {result['speedup']:.2f}x"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fan-out benchmark for the parallelizer pipeline."
+    )
+    parser.add_argument("--branches", type=int, nargs="+", default=[3, 8, 16, 32, 64])
+    parser.add_argument("--latency", type=float, nargs="+", default=[0.05, 0.2])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", default="parallel_benchmark.json")
+    parser.add_argument("--compare", help="Baseline report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(args.branches, args.latency, args.repeats))
+    report = {
+        "benchmark": "parallelization_agent_fan_out",
+        "git_commit": _git_commit(),
+        "adk_version": adk_version,
+        "python": platform.python_version(),
+        "repeats": args.repeats,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📊 Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare_reports(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"❌ {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,12 @@ from google.adk.agents import Agent, SequentialAgent
 from google.adk.models.google_llm import Gemini
 from google.genai import types
 from dotenv import load_dotenv
+import os
+import sys
+
+# Add repository root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from helper.instruction_template import compile_instruction
 
 load_dotenv()
 
@@ -27,8 +33,8 @@ writer_agent = Agent(
     name="WriterAgent",
     model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
     # The `{blog_outline}` placeholder automatically injects the state value from the previous agent's output.
-    instruction="""Following this outline strictly: {blog_outline}
-    Write a brief, 200 to 300-word blog post with an engaging and informative tone.""",
+    instruction=compile_instruction("""Following this outline strictly: {blog_outline}
+    Write a brief, 200 to 300-word blog post with an engaging and informative tone."""),
     output_key="blog_draft",  # The result of this agent will be stored with this key.
 )
 
@@ -38,8 +44,8 @@ editor_agent = Agent(
     name="EditorAgent",
     model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
     # This agent receives the `{blog_draft}` from the writer agent's output.
-    instruction="""Edit this draft: {blog_draft}
-    Your task is to polish the text by fixing any grammatical errors, improving the flow and sentence structure, and enhancing overall clarity.""",
+    instruction=compile_instruction("""Edit this draft: {blog_draft}
+    Your task is to polish the text by fixing any grammatical errors, improving the flow and sentence structure, and enhancing overall clarity."""),
     output_key="final_blog",  # This is the final output of the entire pipeline.
 )
 
@@ -3,11 +3,17 @@ from google.adk.models.google_llm import Gemini
 from google.genai import types
 from google.adk.runners import InMemoryRunner
 
-from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset
 from google.adk.tools.tool_context import ToolContext
 from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams
 from mcp import StdioServerParameters
 import asyncio
+import os
+import sys
+
+# Add repository root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from helper.mcp_pool import pooled_mcp_toolset, warm_up_mcp_pool
+from helper.blob_spill import spill_binary_content
 
 from IPython.display import display, Image as IPImage
 import base64
@@ -25,20 +31,34 @@ def print_image(response):
             for part in event.content.parts:
                 if hasattr(part, "function_response") and part.function_response:
                     for item in part.function_response.response.get("content", []):
-                        if item.get("type") == "image":
+                        if item.get("type") != "image":
+                            continue
+                        if "handle" in item:
+                            # Spilled by spill_binary_content: display from the file
+                            display(IPImage(filename=item["handle"]["path"]))
+                        else:
                             display(IPImage(data=base64.b64decode(item["data"])))
 
 
 # MCP integration with Everything Server
-mcp_image_server = MCPToolset(
-    connection_params=StdioConnectionParams(
-        server_params=StdioServerParameters(
-            command="npx",
-            args=["-y", "@modelcontextprotocol/server-everything"],
-            tool_filter=["getTinyImage"],
-        ),
-        timeout=30,
+# MCP_SERVER=stub uses the local stub_mcp_server.py instead of spawning Node
+if os.getenv("MCP_SERVER") == "stub":
+    server_params = StdioServerParameters(
+        command=sys.executable,
+        args=[os.path.join(os.path.dirname(__file__), "stub_mcp_server.py")],
+    )
+else:
+    server_params = StdioServerParameters(
+        command="npx",
+        args=["-y", "@modelcontextprotocol/server-everything"],
     )
+
+# One warm server per process, shared by every runner and session; the tool
+# list is fetched once instead of on every model call
+mcp_image_server = pooled_mcp_toolset(
+    StdioConnectionParams(server_params=server_params, timeout=30),
+    tool_filter=["getTinyImage"],
+    idle_timeout=float(os.getenv("MCP_IDLE_TIMEOUT", "300")),
 )
 
 
@@ -47,12 +67,16 @@ root_agent = LlmAgent(
     model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
     instruction="You are an image generation agent. Use the mcp_image_server tool to generate images",
     tools=[mcp_image_server],
+    # Images are written to disk once; events only keep a handle to the file
+    after_tool_callback=spill_binary_content,
 )
 
 runner = InMemoryRunner(agent=root_agent)
 
 
 async def main():
+    # Pay the server start-up before the first request, not during it
+    await warm_up_mcp_pool()
     response = await runner.run_debug("Provide a sample tiny image", verbose=True)
     print_image(response)
 
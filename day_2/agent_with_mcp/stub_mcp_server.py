@@ -0,0 +1,40 @@
+from mcp.server.fastmcp import FastMCP, Image
+import base64
+import os
+import time
+
+# Local stand-in for @modelcontextprotocol/server-everything, for testing the
+# MCP pool without Node. Run it over stdio:
+#   python3 stub_mcp_server.py
+# STUB_MCP_STARTUP_DELAY simulates the time `npx` takes to spawn the server.
+
+time.sleep(float(os.getenv("STUB_MCP_STARTUP_DELAY", "0")))
+
+mcp = FastMCP("stub-everything")
+
+# 1x1 transparent PNG
+TINY_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+
+@mcp.tool()
+def getTinyImage() -> Image:
+    """Returns a tiny PNG image."""
+    return Image(data=TINY_PNG, format="png")
+
+
+@mcp.tool()
+def getLargeImage(size_kb: int = 512) -> Image:
+    """Returns a PNG-typed blob of about `size_kb` kilobytes."""
+    return Image(data=TINY_PNG + os.urandom(size_kb * 1024), format="png")
+
+
+@mcp.tool()
+def echo(message: str) -> str:
+    """Echoes the message back."""
+    return message
+
+
+if __name__ == "__main__":
+    mcp.run()
@@ -4,8 +4,17 @@ from google.genai import types
 from google.adk.tools import google_search
 from google.adk.runners import InMemoryRunner
 import asyncio
+import os
+import sys
+import numpy as np
 from dotenv import load_dotenv
 
+# Add repository root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from helper.rate_table import RateTable, write_rate_table
+from helper.tool_memo import MemoizedFunctionTool, print_memo_metrics
+
 
 load_dotenv()
 retry_config= types.HttpRetryOptions(
@@ -20,6 +29,40 @@ retry_config= types.HttpRetryOptions(
 
 # tool declaration
 
+# Rates are stored once, as units of each currency per 1 unit of the pivot
+# currency. Any pair is triangulated through the pivot, so a single vector
+# gives the whole base x target matrix and a batch of conversions is one
+# fancy-indexing lookup instead of one tool round trip per pair.
+#
+# These dicts only seed the rate table file, and only when RATE_TABLE_PATH does
+# not exist yet: editing them has no effect on an existing file. To change
+# rates, call write_rate_table() (e.g. from a rates updater job) or delete the
+# file. The tools read the memory-mapped file, which every worker process
+# shares and which is reloaded when it is replaced.
+PIVOT_CURRENCY = "usd"
+
+RATES_PER_PIVOT = {
+    "usd": 1.0,
+    "ngn": 1500.0,
+    "eur": 0.96,
+    "jpy": 192.0,
+}
+
+# Transaction fees, in percent of the amount sent
+METHOD_FEE_PERCENTAGES = {
+    "visa": 0.75,
+    "verve": 0.1,
+    "mastercard": 0.11,
+}
+
+RATE_TABLE_PATH = os.getenv("RATE_TABLE_PATH") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "rate_table.bin"
+)
+if not os.path.exists(RATE_TABLE_PATH):
+    write_rate_table(RATE_TABLE_PATH, RATES_PER_PIVOT, METHOD_FEE_PERCENTAGES, PIVOT_CURRENCY)
+rate_table = RateTable(RATE_TABLE_PATH)
+
+
 def get_fee_for_payment_method(method: str)-> dict:
     """Looks up the transaction fee percentage for a given payment method.
 
@@ -31,24 +74,19 @@ def get_fee_for_payment_method(method: str)-> dict:
                 e.g., "platinum credit card" or "bank transfer".
 
     Returns:
-        Dictionary with status and fee information.
-        Success: {"status": "success", "fee_percentage": 0.02}
+        Dictionary with status and fee information. The fee is a percentage
+        of the amount sent (0.75 means 0.75%).
+        Success: {"status": "success", "fee_percentage": 0.75}
         Error: {"status": "error", "error_message": "Payment method not found"}
     """
 
+    rates = rate_table.current()
+    index = rates.method_index.get(method.lower())
 
-    method_fee_rate = {
-        "visa": 0.75,
-        "verve":0.1,
-        "mastercard":0.11
-    }
-
-    rate = method_fee_rate.get(method.lower())
-
-    if rate is not None:
+    if index is not None:
         return {
             "status": 'success',
-            'rate': rate
+            'fee_percentage': float(rates.fee_percentages[index])
         }
     else:
         return {
@@ -75,27 +113,126 @@ def get_exchange_rate(base_currency: str, target_currency:str) -> dict:
         Error: {"status": "error", "error_message": "Unsupported currency pair"}
     """
 
-
-    lookup_db_currencies ={
-        "usd":{
-            "ngn": 1500,
-            'eur': 0.96,
-            'jpy': 192
-        }
-    }
-
     base = base_currency.lower()
     target = target_currency.lower()
 
-    rate = lookup_db_currencies.get(base).get(target)
-
-    if rate is not None:
-        return {"status":"success", "rate": rate}
+    # Unknown codes are an error, not an AttributeError on a missing row
+    rates = rate_table.current()
+    if base in rates.currency_index and target in rates.currency_index:
+        rate = rates.rate_matrix[rates.currency_index[base], rates.currency_index[target]]
+        return {"status":"success", "rate": float(rate)}
     else:
         return {"status":"error", "error_message": f"equivalent currencies, {base, target} cannot be found"}
 
 print("exchange rate calculated successfully")
 
+# Rates stay consistent within a conversation; a reloaded rate table reaches
+# sessions once their cached rate expires.
+get_exchange_rate_tool = MemoizedFunctionTool(
+    get_exchange_rate,
+    scope="session",
+    ttl=60,
+    should_cache=lambda result: isinstance(result, dict)
+    and result.get("status") == "success",
+)
+
+
+def convert_currency_batch(
+    amounts: list[float],
+    base_currencies: list[str],
+    target_currencies: list[str],
+    payment_methods: list[str],
+) -> dict:
+    """Converts many amounts at once, fees included.
+
+    The four lists are read position by position: conversion i sends
+    amounts[i] of base_currencies[i] with payment_methods[i] and receives
+    target_currencies[i]. Use this tool whenever more than one conversion is
+    requested, instead of calling the single-pair tools for each one.
+
+    Args:
+        amounts: Amounts to send, in their base currency.
+        base_currencies: ISO 4217 codes converted from (e.g., "USD").
+        target_currencies: ISO 4217 codes converted to (e.g., "NGN").
+        payment_methods: Payment method of each conversion (e.g., "visa").
+
+    Returns:
+        Dictionary with status, one result per conversion and the total
+        received per target currency.
+        Success: {"status": "success", "conversions": [{"amount": 500,
+                  "base_currency": "USD", "target_currency": "NGN",
+                  "payment_method": "visa", "fee_percentage": 0.75,
+                  "fee": 3.75, "amount_after_fee": 496.25, "rate": 1500.0,
+                  "converted_amount": 744375.0}, ...],
+                  "totals": {"NGN": 744375.0}}
+        A conversion with an unknown currency or payment method has its own
+        "error_message" and is left out of the totals.
+        Error: {"status": "error", "error_message": "..."}
+    """
+
+    count = len(amounts)
+    if not (len(base_currencies) == len(target_currencies) == len(payment_methods) == count):
+        return {
+            "status": "error",
+            "error_message": "amounts, base_currencies, target_currencies and payment_methods must have the same length",
+        }
+
+    # One snapshot for the whole batch, even if the table is reloaded meanwhile
+    rates = rate_table.current()
+    currency_index = rates.currency_index
+    method_index = rates.method_index
+
+    # -1 marks unknown codes; they are masked out below
+    base_idx = np.array([currency_index.get(c.lower(), -1) for c in base_currencies], dtype=np.intp)
+    target_idx = np.array([currency_index.get(c.lower(), -1) for c in target_currencies], dtype=np.intp)
+    method_idx = np.array([method_index.get(m.lower(), -1) for m in payment_methods], dtype=np.intp)
+    valid = (base_idx >= 0) & (target_idx >= 0) & (method_idx >= 0)
+
+    amount = np.asarray(amounts, dtype=np.float64)
+    rate = np.where(valid, rates.rate_matrix[base_idx, target_idx], np.nan)
+    fee_percentage = np.where(valid, rates.fee_percentages[method_idx], np.nan)
+    fee = amount * fee_percentage / 100
+    amount_after_fee = amount - fee
+    converted = amount_after_fee * rate
+
+    totals = np.bincount(
+        target_idx[valid], weights=converted[valid], minlength=len(currency_index)
+    )
+    currencies = list(currency_index)
+
+    conversions = []
+    for i in range(count):
+        result = {
+            "amount": float(amount[i]),
+            "base_currency": base_currencies[i].upper(),
+            "target_currency": target_currencies[i].upper(),
+            "payment_method": payment_methods[i],
+        }
+        if valid[i]:
+            result.update(
+                fee_percentage=float(fee_percentage[i]),
+                fee=round(float(fee[i]), 2),
+                amount_after_fee=round(float(amount_after_fee[i]), 2),
+                rate=float(rate[i]),
+                converted_amount=round(float(converted[i]), 2),
+            )
+        elif method_idx[i] < 0:
+            result["error_message"] = f"Payment method: {payment_methods[i]} not found"
+        else:
+            result["error_message"] = f"equivalent currencies, {base_currencies[i], target_currencies[i]} cannot be found"
+        conversions.append(result)
+
+    return {
+        "status": "success",
+        "conversions": conversions,
+        "totals": {
+            currencies[i].upper(): round(float(totals[i]), 2)
+            for i in np.unique(target_idx[valid])
+        },
+    }
+
+print("batch conversion defined successfully")
+
 
 
 currency_agent = Agent(
@@ -116,9 +253,13 @@ currency_agent = Agent(
         Then, explain how you got that result by showing the intermediate amounts. Your explanation must include: the fee percentage and its
         value in the original currency, the amount remaining after the fee, and the exchange rate used for the final conversion.
 
+    When the user asks for several conversions at once (e.g. a list of invoices), call
+    `convert_currency_batch()` once with all of them instead of the tools above; it
+    returns the fee, rate and converted amount of each conversion and the totals.
+
     If any tool returns status "error", explain the issue to the user clearly.
     """,
-    tools=[get_fee_for_payment_method, get_exchange_rate]
+    tools=[get_fee_for_payment_method, get_exchange_rate_tool, convert_currency_batch]
 )
 
 # Test the currency agent
@@ -128,6 +269,7 @@ currency_runner = InMemoryRunner(agent = currency_agent)
 async def main():
     result = await currency_runner.run_debug("I want to convert 500 USD to Nigerian Naira using visa")
     print(result)
+    print_memo_metrics()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
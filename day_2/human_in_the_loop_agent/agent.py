@@ -6,11 +6,15 @@ from google.adk.apps.app import App, ResumabilityConfig
 from google.adk.sessions import InMemorySessionService
 from google.adk.runners import Runner
 from google.genai import types
-from helper.check_for_approval import check_for_approval
 from helper.create_approval_response import (
     create_approval_response,
 )
 from helper.print_agent_response import print_agent_response
+from helper.pending_approvals import PendingApprovalStore
+from helper.workflow_checkpoints import WorkflowCheckpointStore
+import asyncio
+import os
+import time
 import uuid
 
 from dotenv import load_dotenv
@@ -114,6 +118,18 @@ root_agent = App(
 session_service = InMemorySessionService()
 shipping_runner = Runner(app=root_agent, session_service=session_service)
 
+# Approvals are indexed as the events stream past, so resuming is a lookup by
+# approval_id. The file can be shared with the process that resumes orders.
+approval_store = PendingApprovalStore(
+    os.getenv("APPROVAL_STORE_PATH", "pending_approvals.db")
+)
+
+# Paused invocations are snapshotted to disk, so a restarted worker can still
+# resume them although InMemorySessionService forgot the sessions
+checkpoint_store = WorkflowCheckpointStore(
+    os.getenv("CHECKPOINT_STORE_PATH", "workflow_checkpoints.db")
+)
+
 
 # Understand Key Technical Concepts¶
 # 👉 events - ADK creates events as the agent executes. Tool calls, model responses, function results - all become events
@@ -130,59 +146,108 @@ shipping_runner = Runner(app=root_agent, session_service=session_service)
 # Without it, ADK would start a NEW execution instead of resuming the paused one
 
 
-async def run_shipping_workflow(query: str, auto_approve: bool = True):
-    """Runs a shipping workflow with approval handling.
+async def submit_order(query: str, user_id: str = "test_user"):
+    """Sends a shipping request in a new session.
 
-    Args:
-        query: User's shipping request
-        auto_approve: Whether to auto-approve large orders (simulates human decision)
+    Returns:
+        (approval_info or None, events that carry text)
     """
-
-    print(f"\n{'='*60}")
-    print(f"User > {query}\n")
-
     # Generate unique session ID
     session_id = f"order_{uuid.uuid4().hex[:8]}"
 
     # Create session
     await session_service.create_session(
-        app_name="shipping_coordinator", user_id="test_user", session_id=session_id
+        app_name="shipping_coordinator", user_id=user_id, session_id=session_id
     )
 
     query_content = types.Content(role="user", parts=[types.Part(text=query)])
-    events = []
+    approval_info = None
+    text_events = []
 
     # -----------------------------------------------------------------------------------------------
     # -----------------------------------------------------------------------------------------------
     # STEP 1: Send initial request to the Agent. If num_containers > 5, the Agent returns the special `adk_request_confirmation` event
+    # STEP 2: Each event is checked as it arrives; an `adk_request_confirmation` is recorded in the approval store.
     async for event in shipping_runner.run_async(
-        user_id="test_user", session_id=session_id, new_message=query_content
+        user_id=user_id, session_id=session_id, new_message=query_content
     ):
-        events.append(event)
+        approval_info = (
+            approval_store.observe(
+                event,
+                app_name="shipping_coordinator",
+                user_id=user_id,
+                session_id=session_id,
+            )
+            or approval_info
+        )
+        if event.content and any(part.text for part in event.content.parts or []):
+            text_events.append(event)
 
-    # -----------------------------------------------------------------------------------------------
-    # -----------------------------------------------------------------------------------------------
-    # STEP 2: Loop through all the events generated and check if `adk_request_confirmation` is present.
-    approval_info = check_for_approval(events)
+    if approval_info:
+        session = await session_service.get_session(
+            app_name="shipping_coordinator", user_id=user_id, session_id=session_id
+        )
+        checkpoint_store.save(session, approval_info["invocation_id"])
+
+    return approval_info, text_events
+
+
+async def resume_order(approval_info, approved: bool):
+    """Resumes a paused order with the human decision, yielding its events.
+
+    The session is restored from its checkpoint first if this process does not
+    know it (e.g. after a restart).
+    """
+    app_name = "shipping_coordinator"
+    user_id = approval_info["user_id"]
+    session_id = approval_info["session_id"]
+    if not await checkpoint_store.rehydrate(
+        session_service, app_name, user_id, session_id
+    ):
+        raise ValueError(f"No session or checkpoint for {session_id}")
+
+    async for event in shipping_runner.run_async(
+        user_id=user_id,
+        session_id=session_id,
+        new_message=create_approval_response(
+            approval_info, approved
+        ),  # Send human decision here
+        invocation_id=approval_info[
+            "invocation_id"
+        ],  # Critical: same invocation_id tells ADK to RESUME
+    ):
+        yield event
+
+    checkpoint_store.delete(app_name, user_id, session_id)
+
+
+async def run_shipping_workflow(query: str, auto_approve: bool = True):
+    """Runs a shipping workflow with approval handling.
+
+    Args:
+        query: User's shipping request
+        auto_approve: Whether to auto-approve large orders (simulates human decision)
+    """
+
+    print(f"\n{'='*60}")
+    print(f"User > {query}\n")
+
+    # STEP 1 + 2: Send the request and record a pending approval if the agent pauses
+    approval_info, text_events = await submit_order(query)
 
     # -----------------------------------------------------------------------------------------------
     # -----------------------------------------------------------------------------------------------
     # STEP 3: If the event is present, it's a large order - HANDLE APPROVAL WORKFLOW
     if approval_info:
         print(f"⏸️  Pausing for approval...")
+        # Constant-time lookup; None if another worker already resumed it
+        approval_info = approval_store.pop(approval_info["approval_id"])
+        if approval_info is None:
+            return
         print(f"🤔 Human Decision: {'APPROVE ✅' if auto_approve else 'REJECT ❌'}\n")
 
         # PATH A: Resume the agent by calling run_async() again with the approval decision
-        async for event in shipping_runner.run_async(
-            user_id="test_user",
-            session_id=session_id,
-            new_message=create_approval_response(
-                approval_info, auto_approve
-            ),  # Send human decision here
-            invocation_id=approval_info[
-                "invocation_id"
-            ],  # Critical: same invocation_id tells ADK to RESUME
-        ):
+        async for event in resume_order(approval_info, auto_approve):
             if event.content and event.content.parts:
                 for part in event.content.parts:
                     if part.text:
@@ -192,11 +257,74 @@ async def run_shipping_workflow(query: str, auto_approve: bool = True):
     # -----------------------------------------------------------------------------------------------
     else:
         # PATH B: If the `adk_request_confirmation` is not present - no approval needed - order completed immediately.
-        print_agent_response(events)
+        print_agent_response(text_events)
 
     # print(f"{'='*60}\n")
 
 
+async def resume_approvals(decisions, max_concurrency: int = 20) -> dict:
+    """Resumes many paused orders at once.
+
+    Args:
+        decisions: Iterable of (approval_id, approved) pairs
+        max_concurrency: Maximum number of invocations resumed at the same time
+
+    Returns:
+        Dictionary with one status per order and the totals
+        {"orders": [{"approval_id": "adk-...", "status": "approved",
+                     "order_id": "ORD-10-MANUAL", "error": None}],
+         "counts": {"approved": 1}, "wall_time_s": 0.8}
+        Besides the tool's own statuses, "not_found" means the approval was
+        not pending, "resumed_no_result" that the invocation resumed without
+        reporting an order status, and "error" that resuming failed.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def resume_one(approval_id, approved):
+        result = {
+            "approval_id": approval_id,
+            "session_id": None,
+            "status": "not_found",
+            "order_id": None,
+            "error": None,
+        }
+        async with semaphore:
+            # Taking it out of the store also stops two operators resuming it twice
+            approval_info = approval_store.pop(approval_id)
+            if approval_info is None:
+                return result
+            result["session_id"] = approval_info["session_id"]
+            # Resumed, but no final order status seen (yet)
+            result["status"] = "resumed_no_result"
+
+            try:
+                async for event in resume_order(approval_info, approved):
+                    # The resumed tool call reports the final order status
+                    for response in event.get_function_responses():
+                        if response.name == "place_shipping_order":
+                            result["status"] = response.response.get("status")
+                            result["order_id"] = response.response.get("order_id")
+            except Exception as e:
+                # Put it back so the decision can be retried
+                approval_store.add(approval_info)
+                result["status"] = "error"
+                result["error"] = f"{type(e).__name__}: {e}"
+        return result
+
+    start = time.perf_counter()
+    orders = await asyncio.gather(
+        *(resume_one(approval_id, approved) for approval_id, approved in decisions)
+    )
+    counts = {}
+    for order in orders:
+        counts[order["status"]] = counts.get(order["status"], 0) + 1
+    return {
+        "orders": orders,
+        "counts": counts,
+        "wall_time_s": time.perf_counter() - start,
+    }
+
+
 async def main():
     # Demo 1: It's a small order. Agent receives auto-approved status from tool
     await run_shipping_workflow("Ship 3 containers to Singapore")
@@ -208,10 +336,26 @@ async def main():
     await run_shipping_workflow("Ship 8 containers to Los Angeles", auto_approve=False)
 
 
-if __name__ == "__main__":
-    import asyncio
+async def main_batch():
+    # Operators approve many large orders in one go
+    destinations = ["Rotterdam", "Hamburg", "Shanghai", "Santos", "Durban"]
+    submitted = await asyncio.gather(
+        *(submit_order(f"Ship 10 containers to {d}") for d in destinations)
+    )
+    decisions = [
+        (approval_info["approval_id"], True)
+        for approval_info, _ in submitted
+        if approval_info
+    ]
+    summary = await resume_approvals(decisions, max_concurrency=10)
+    for order in summary["orders"]:
+        print(order)
+    print(f"✅ {summary['counts']} in {summary['wall_time_s']:.2f}s")
+
 
+if __name__ == "__main__":
     asyncio.run(main())
+    # asyncio.run(main_batch())
 
 # RUNNING INSTRUICTION
 # I had issue running this with
@@ -7,6 +7,8 @@
 # Returns approval_id (identifies this specific request) and invocation_id (identifies which execution to resume)
 # Returns None if no pause detected
 
+from helper.pending_approvals import find_approval_request
+
 
 def check_for_approval(events):
     """Check if events contain an approval request.
@@ -15,14 +17,7 @@ def check_for_approval(events):
         dict with approval details or None
     """
     for event in events:
-        if event.content and event.content.parts:
-            for part in event.content.parts:
-                if (
-                    part.function_call
-                    and part.function_call.name == "adk_request_confirmation"
-                ):
-                    return {
-                        "approval_id": part.function_call.id,
-                        "invocation_id": event.invocation_id,
-                    }
+        approval_info = find_approval_request(event)
+        if approval_info:
+            return approval_info
     return None
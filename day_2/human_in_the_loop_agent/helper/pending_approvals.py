@@ -0,0 +1,198 @@
+import json
+import sqlite3
+import threading
+import time
+
+# PendingApprovalStore - Remembers paused workflows
+
+# Records every adk_request_confirmation event as it streams past (no rescan
+# of the session afterwards), keyed by approval_id and indexed by
+# invocation_id. Stored in SQLite, so another process can look up the paused
+# invocation and resume it.
+
+REQUEST_CONFIRMATION = "adk_request_confirmation"
+
+
+def find_approval_request(event):
+    """Returns the approval info if this event pauses for a confirmation."""
+    if not event.content:
+        return None
+    for call in event.get_function_calls():
+        if call.name == REQUEST_CONFIRMATION:
+            return {"approval_id": call.id, "invocation_id": event.invocation_id}
+    return None
+
+
+class PendingApprovalStore:
+    """SQLite-backed index of approvals waiting for a human decision.
+
+    Args:
+        path: SQLite file shared by every process that resumes workflows.
+              ":memory:" keeps the approvals in this process only.
+    """
+
+    def __init__(self, path="pending_approvals.db"):
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ":memory:":
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(
+                """
+                create table if not exists pending_approvals (
+                    approval_id text primary key,
+                    invocation_id text not null,
+                    app_name text,
+                    user_id text,
+                    session_id text,
+                    hint text,
+                    payload text,
+                    created_at real not null
+                );
+                create index if not exists ix_pending_approvals_invocation
+                    on pending_approvals (invocation_id);
+                create index if not exists ix_pending_approvals_created
+                    on pending_approvals (created_at);
+                """
+            )
+            self._connection.commit()
+
+    @staticmethod
+    def _row_to_info(row):
+        if row is None:
+            return None
+        keys = (
+            "approval_id",
+            "invocation_id",
+            "app_name",
+            "user_id",
+            "session_id",
+            "hint",
+            "payload",
+            "created_at",
+        )
+        info = dict(zip(keys, row))
+        info["payload"] = json.loads(info["payload"]) if info["payload"] else None
+        return info
+
+    def observe(self, event, app_name=None, user_id=None, session_id=None):
+        """Records the event if it is an approval request.
+
+        Call it on every event while iterating run_async().
+
+        Returns:
+            The approval info (approval_id, invocation_id, ...) or None
+        """
+        approval_info = find_approval_request(event)
+        if approval_info is None:
+            return None
+
+        # The confirmation request carries the tool's hint and payload
+        confirmation = {}
+        for call in event.get_function_calls():
+            if call.id == approval_info["approval_id"]:
+                confirmation = (call.args or {}).get("toolConfirmation") or {}
+        approval_info.update(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            hint=confirmation.get("hint"),
+            payload=confirmation.get("payload"),
+            created_at=time.time(),
+        )
+        self.add(approval_info)
+        return approval_info
+
+    def add(self, approval_info):
+        """Stores an approval (e.g. puts back one whose resume failed)."""
+        with self._lock:
+            self._connection.execute(
+                "insert or replace into pending_approvals values (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    approval_info["approval_id"],
+                    approval_info["invocation_id"],
+                    approval_info.get("app_name"),
+                    approval_info.get("user_id"),
+                    approval_info.get("session_id"),
+                    approval_info.get("hint"),
+                    json.dumps(approval_info.get("payload")),
+                    approval_info.get("created_at") or time.time(),
+                ),
+            )
+            self._connection.commit()
+
+    def get(self, approval_id):
+        """Looks up a pending approval by its approval_id."""
+        with self._lock:
+            row = self._connection.execute(
+                "select * from pending_approvals where approval_id = ?", (approval_id,)
+            ).fetchone()
+        return self._row_to_info(row)
+
+    def pop(self, approval_id):
+        """Removes and returns a pending approval (None if already handled)."""
+        with self._lock:
+            row = self._connection.execute(
+                "delete from pending_approvals where approval_id = ? returning *",
+                (approval_id,),
+            ).fetchone()
+            self._connection.commit()
+        return self._row_to_info(row)
+
+    def for_invocation(self, invocation_id):
+        """Pending approvals of one paused invocation."""
+        with self._lock:
+            rows = self._connection.execute(
+                "select * from pending_approvals where invocation_id = ?",
+                (invocation_id,),
+            ).fetchall()
+        return [self._row_to_info(row) for row in rows]
+
+    def list_pending(self, user_id=None, older_than=None, limit=None):
+        """Pending approvals, oldest first.
+
+        Args:
+            user_id: Only approvals of this user.
+            older_than: Only approvals waiting longer than this many seconds.
+            limit: Maximum number of approvals returned.
+        """
+        query = "select * from pending_approvals where 1 = 1"
+        params = []
+        if user_id is not None:
+            query += " and user_id = ?"
+            params.append(user_id)
+        if older_than is not None:
+            query += " and created_at < ?"
+            params.append(time.time() - older_than)
+        query += " order by created_at"
+        if limit is not None:
+            query += " limit ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        return [self._row_to_info(row) for row in rows]
+
+    def expire(self, max_age):
+        """Drops approvals older than `max_age` seconds.
+
+        Returns:
+            The expired approvals
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "delete from pending_approvals where created_at < ? returning *",
+                (time.time() - max_age,),
+            ).fetchall()
+            self._connection.commit()
+        return [self._row_to_info(row) for row in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute(
+                "select count(*) from pending_approvals"
+            ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,147 @@
+from google.adk.events import Event
+from google.adk.sessions.state import State
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+# WorkflowCheckpointStore - Keeps paused workflows across restarts
+
+# ResumabilityConfig only needs the events of the paused invocation (the user
+# message, the tool call and the adk_request_confirmation request) and the
+# session state to resume it. Those are snapshotted into SQLite when the
+# workflow pauses, instead of persisting every session's full event log.
+#
+# Nothing is loaded at startup: a workflow is put back into the (in-memory)
+# session service only right before it is resumed.
+
+
+class WorkflowCheckpointStore:
+    """SQLite store of paused invocations, rehydrated on demand.
+
+    Args:
+        path: SQLite file that outlives the worker process.
+    """
+
+    def __init__(self, path="workflow_checkpoints.db"):
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ":memory:":
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                """
+                create table if not exists workflow_checkpoints (
+                    app_name text not null,
+                    user_id text not null,
+                    session_id text not null,
+                    invocation_id text not null,
+                    state text not null,
+                    events blob not null,
+                    created_at real not null,
+                    primary key (app_name, user_id, session_id)
+                )
+                """
+            )
+            self._connection.commit()
+
+    def save(self, session, invocation_id):
+        """Snapshots the paused invocation of a session."""
+        events = [
+            event.model_dump(mode="json", exclude_none=True)
+            for event in session.events
+            if event.invocation_id == invocation_id
+        ]
+        # app:/user: state lives outside the session, temp: is never persisted
+        state = {
+            key: value
+            for key, value in session.state.items()
+            if not key.startswith(
+                (State.APP_PREFIX, State.USER_PREFIX, State.TEMP_PREFIX)
+            )
+        }
+        with self._lock:
+            self._connection.execute(
+                "insert or replace into workflow_checkpoints values (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    session.app_name,
+                    session.user_id,
+                    session.id,
+                    invocation_id,
+                    json.dumps(state),
+                    zlib.compress(json.dumps(events).encode()),
+                    time.time(),
+                ),
+            )
+            self._connection.commit()
+
+    def _load(self, app_name, user_id, session_id):
+        with self._lock:
+            return self._connection.execute(
+                "select invocation_id, state, events from workflow_checkpoints"
+                " where app_name = ? and user_id = ? and session_id = ?",
+                (app_name, user_id, session_id),
+            ).fetchone()
+
+    async def rehydrate(self, session_service, app_name, user_id, session_id):
+        """Recreates a checkpointed session if the session service lost it.
+
+        Returns:
+            True if the session is available for resuming
+        """
+        session = await session_service.get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        )
+        if session is not None:
+            return True
+
+        row = self._load(app_name, user_id, session_id)
+        if row is None:
+            return False
+        _, state, events = row
+        session = await session_service.create_session(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            state=json.loads(state),
+        )
+        for event_data in json.loads(zlib.decompress(events)):
+            await session_service.append_event(
+                session=session, event=Event.model_validate(event_data)
+            )
+        return True
+
+    def delete(self, app_name, user_id, session_id):
+        """Drops the checkpoint once the workflow has been resumed."""
+        with self._lock:
+            self._connection.execute(
+                "delete from workflow_checkpoints"
+                " where app_name = ? and user_id = ? and session_id = ?",
+                (app_name, user_id, session_id),
+            )
+            self._connection.commit()
+
+    def list_paused(self, limit=None):
+        """(app_name, user_id, session_id, invocation_id) of paused workflows.
+
+        Only the keys are read, so this stays fast with many checkpoints.
+        """
+        query = (
+            "select app_name, user_id, session_id, invocation_id"
+            " from workflow_checkpoints order by created_at"
+        )
+        params = []
+        if limit is not None:
+            query += " limit ?"
+            params.append(limit)
+        with self._lock:
+            return self._connection.execute(query, params).fetchall()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute(
+                "select count(*) from workflow_checkpoints"
+            ).fetchone()[0]
@@ -1,5 +1,4 @@
 from google.adk.apps.app import App, EventsCompactionConfig
-from google.adk.sessions import DatabaseSessionService
 from google.adk.runners import Runner
 from simple_persistent_chatbot import simple_chatbot
 import sys
@@ -9,24 +8,54 @@ import asyncio
 # Add parent directory to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from helper.run_session import run_session
+from helper.batched_session_service import BatchedDatabaseSessionService
+from helper.session_events import find_latest_compaction_event
+from helper.incremental_summarizer import (
+    IncrementalEventsSummarizer,
+    print_compaction_stats,
+)
+from helper.token_budget_compaction import TokenBudgetCompactionPlugin
 
 USER_ID = os.getenv("USER_ID")
 APP_NAME = os.getenv("APP_NAME")
 
-# declare my app
+# Summarizes only the turns the previous summary does not cover, in the
+# background task the Runner starts after each turn
+compaction_summarizer = IncrementalEventsSummarizer(
+    llm=simple_chatbot.canonical_model,
+    on_compaction=[print_compaction_stats],
+)
 
-research_compaction = App(
-    name="research_compacter",
-    root_agent=simple_chatbot,
-    events_compaction_config=EventsCompactionConfig(
-        compaction_interval=3, overlap_size=1
-    ),
+# Compact when the estimated prompt passes the high watermark, down to the
+# low watermark. COMPACTION_POLICY=interval restores the fixed 3-turn interval.
+compaction_plugin = TokenBudgetCompactionPlugin(
+    high_watermark=int(os.getenv("COMPACTION_HIGH_WATERMARK", "8000")),
+    low_watermark=int(os.getenv("COMPACTION_LOW_WATERMARK", "4000")),
+    summarizer=compaction_summarizer,
 )
 
+# declare my app
+
+if os.getenv("COMPACTION_POLICY") == "interval":
+    research_compaction = App(
+        name="research_compacter",
+        root_agent=simple_chatbot,
+        events_compaction_config=EventsCompactionConfig(
+            compaction_interval=3, overlap_size=1, summarizer=compaction_summarizer
+        ),
+    )
+else:
+    research_compaction = App(
+        name="research_compacter",
+        root_agent=simple_chatbot,
+        plugins=[compaction_plugin],
+    )
+
 
 # create session
 db_url = "sqlite:///my_agent_data2.db"
-session_service = DatabaseSessionService(db_url=db_url)
+# WAL mode + batched commits; pending events are flushed at exit
+session_service = BatchedDatabaseSessionService(db_url=db_url)
 
 # runner
 research_runner = Runner(app=research_compaction, session_service=session_service)
@@ -71,27 +100,27 @@ async def main1():
         "compaction_demo",
     )
 
+    # Let background compactions finish before the event loop closes
+    await compaction_plugin.wait_idle()
+    await compaction_summarizer.wait_idle()
+
 
 async def main2():
-    # Get the final session state
-    final_session = await session_service.get_session(
+    print("--- Searching for Compaction Summary Event ---")
+    # Walks the events newest-first without loading their content, instead of
+    # pulling the whole conversation into memory with get_session()
+    event = await find_latest_compaction_event(
+        session_service,
         app_name=research_runner.app_name,
         user_id=USER_ID,
         session_id="compaction_demo",
     )
 
-    print("--- Searching for Compaction Summary Event ---")
-    found_summary = False
-    for event in final_session.events:
-        # Compaction events have a 'compaction' attribute
-        if event.actions and event.actions.compaction:
-            print("\n SUCCESS! Found the Compaction Event:")
-            print(f"  Author: {event.author}")
-            print(f"\n Compacted information: {event}")
-            found_summary = True
-            break
-
-    if not found_summary:
+    if event:
+        print("\n SUCCESS! Found the Compaction Event:")
+        print(f"  Author: {event.author}")
+        print(f"\n Compacted information: {event}")
+    else:
         print(
             "\n No compaction event found. Try increasing the number of turns in the demo."
         )
@@ -1,15 +1,204 @@
+import argparse
+import json
 import sqlite3
+import sys
+import time
+from datetime import datetime
 
+# Inspect the events table written by DatabaseSessionService.
+#
+# Rows are streamed from a cursor (never fetchall()), every filter maps onto an
+# index, and results can be printed or exported to JSONL / Parquet.
+#
+# Examples:
+#   python3 print_db_content.py --db my_agent_data2.db --ensure-indexes
+#   python3 print_db_content.py --app research_compacter --session compaction_demo
+#   python3 print_db_content.py --author text_chat_bot --since 2025-11-20 --format jsonl -o out.jsonl
+#   python3 print_db_content.py --compaction-only --format parquet -o compactions.parquet
 
-def check_data_in_db():
-    with sqlite3.connect("my_agent_data2.db") as connection:
-        cursor = connection.cursor()
-        result = cursor.execute(
-            "select app_name, session_id, author, content from events"
+# Pickled EventActions only contain this class name when a compaction is set
+IS_COMPACTION = "instr(actions, cast('EventCompaction' as blob)) > 0"
+
+INDEXES = {
+    # Same name and columns as helper/session_events.SESSION_TIMESTAMP_INDEX
+    "ix_events_session_timestamp": "on events (app_name, user_id, session_id, timestamp)",
+    "ix_events_app_timestamp": "on events (app_name, timestamp)",
+    "ix_events_author_timestamp": "on events (author, timestamp)",
+    "ix_events_timestamp": "on events (timestamp)",
+    # Partial index: only compaction events, so --compaction-only stays tiny
+    "ix_events_compaction": f"on events (timestamp) where {IS_COMPACTION}",
+}
+
+COLUMNS = [
+    "app_name",
+    "user_id",
+    "session_id",
+    "invocation_id",
+    "author",
+    "timestamp",
+    "content",
+]
+
+
+def ensure_indexes(connection, create: bool) -> list[str]:
+    """Creates the inspection indexes (or lists the missing ones)."""
+    existing = {
+        row[0]
+        for row in connection.execute(
+            "select name from sqlite_master where type = 'index' and tbl_name = 'events'"
+        )
+    }
+    missing = [name for name in INDEXES if name not in existing]
+    if create:
+        for name in missing:
+            connection.execute(f"create index if not exists {name} {INDEXES[name]}")
+        connection.commit()
+        return []
+    return missing
+
+
+def _to_db_timestamp(value: str) -> str:
+    # Timestamps are stored as local, naive "YYYY-MM-DD HH:MM:SS.ffffff" text
+    try:
+        moment = datetime.fromtimestamp(float(value))
+    except ValueError:
+        moment = datetime.fromisoformat(value)
+    return moment.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def build_query(args) -> tuple[str, list]:
+    conditions = []
+    params = []
+    for column in ("app_name", "user_id", "session_id", "author"):
+        value = getattr(args, column)
+        if value:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    if args.since:
+        conditions.append("timestamp >= ?")
+        params.append(_to_db_timestamp(args.since))
+    if args.until:
+        conditions.append("timestamp < ?")
+        params.append(_to_db_timestamp(args.until))
+    if args.compaction_only:
+        conditions.append(IS_COMPACTION)
+
+    query = f"select {', '.join(COLUMNS)}, {IS_COMPACTION} as is_compaction from events"
+    if conditions:
+        query += " where " + " and ".join(conditions)
+    query += " order by timestamp"
+    if args.limit:
+        query += " limit ?"
+        params.append(args.limit)
+    return query, params
+
+
+def stream_rows(cursor, batch_size: int):
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        for row in rows:
+            yield dict(zip(COLUMNS + ["is_compaction"], row))
+
+
+def write_table(rows, out):
+    print(COLUMNS + ["is_compaction"], file=out)
+    count = 0
+    for row in rows:
+        print(tuple(row.values()), file=out)
+        count += 1
+    return count
+
+
+def write_jsonl(rows, out):
+    count = 0
+    for row in rows:
+        row["content"] = json.loads(row["content"]) if row["content"] else None
+        row["is_compaction"] = bool(row["is_compaction"])
+        out.write(json.dumps(row, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def write_parquet(rows, path: str, batch_size: int):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        sys.exit("Parquet export needs pyarrow: pip install pyarrow")
+
+    schema = pa.schema(
+        [(column, pa.string()) for column in COLUMNS] + [("is_compaction", pa.bool_())]
+    )
+    count = 0
+    batch = []
+    with pq.ParquetWriter(path, schema) as writer:
+        for row in rows:
+            row["is_compaction"] = bool(row["is_compaction"])
+            batch.append(row)
+            if len(batch) >= batch_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            count += len(batch)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect ADK session events.")
+    parser.add_argument("--db", default="my_agent_data2.db")
+    parser.add_argument("--app", dest="app_name")
+    parser.add_argument("--user", dest="user_id")
+    parser.add_argument("--session", dest="session_id")
+    parser.add_argument("--author")
+    parser.add_argument("--since", help="ISO datetime or epoch seconds")
+    parser.add_argument("--until", help="ISO datetime or epoch seconds")
+    parser.add_argument("--compaction-only", action="store_true")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--format", choices=["table", "jsonl", "parquet"], default="table")
+    parser.add_argument("-o", "--output", help="Output file (stdout by default)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--ensure-indexes", action="store_true")
+    parser.add_argument("--explain", action="store_true", help="Print the query plan")
+    args = parser.parse_args()
+
+    with sqlite3.connect(args.db) as connection:
+        missing = ensure_indexes(connection, create=args.ensure_indexes)
+        if missing:
+            print(
+                f"⚠️  Missing indexes {missing}; run with --ensure-indexes",
+                file=sys.stderr,
+            )
+
+        query, params = build_query(args)
+        if args.explain:
+            for row in connection.execute(f"explain query plan {query}", params):
+                print(row[-1], file=sys.stderr)
+
+        start = time.perf_counter()
+        rows = stream_rows(connection.execute(query, params), args.batch_size)
+
+        if args.format == "parquet":
+            if not args.output:
+                sys.exit("Parquet export needs --output")
+            count = write_parquet(rows, args.output, args.batch_size)
+        else:
+            out = open(args.output, "w") if args.output else sys.stdout
+            try:
+                writer = write_jsonl if args.format == "jsonl" else write_table
+                count = writer(rows, out)
+            finally:
+                if args.output:
+                    out.close()
+
+        print(
+            f"✅ {count} events in {1000 * (time.perf_counter() - start):.1f} ms",
+            file=sys.stderr,
         )
-        print([_[0] for _ in result.description])
-        for each in result.fetchall():
-            print(each)
 
 
-check_data_in_db()
+if __name__ == "__main__":
+    main()
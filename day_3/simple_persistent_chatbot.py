@@ -1,7 +1,6 @@
 from google.adk.agents import Agent
 from google.adk.models.google_llm import Gemini
 from google.genai import types
-from google.adk.sessions import DatabaseSessionService
 from google.adk.runners import Runner
 import asyncio
 import os
@@ -11,6 +10,7 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from helper.run_session import run_session
+from helper.batched_session_service import BatchedDatabaseSessionService
 
 
 # step1: define agent
@@ -26,7 +26,8 @@ simple_chatbot = Agent(
 
 # step 2: Make a session
 db_url = "sqlite:///my_agent_data.db"
-session_service = DatabaseSessionService(db_url=db_url)
+# WAL mode + batched commits; pending events are flushed at exit
+session_service = BatchedDatabaseSessionService(db_url=db_url)
 
 # step 3: declare my runner
 APP_NAME = os.getenv("APP_NAME")
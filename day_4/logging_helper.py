@@ -1,5 +1,10 @@
 import logging
 import os
+import sys
+
+# Add repository root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from helper.structured_logging import start_json_logging
 
 # Clean up any previous logs
 for log_file in ["logger.log", "web.log", "tunnel.log"]:
@@ -7,11 +12,13 @@ for log_file in ["logger.log", "web.log", "tunnel.log"]:
         os.remove(log_file)
         print(f"🧹 Cleaned up {log_file}")
 
-# Configure logging with DEBUG log level.
-logging.basicConfig(
+# Configure logging with DEBUG log level (LOG_LEVEL overrides it).
+# Records are written as JSON lines by a background thread, so logging never
+# blocks the event loop; logger.log rotates every LOG_MAX_BYTES.
+start_json_logging(
     filename="logger.log",
-    level=logging.DEBUG,
-    format="%(filename)s:%(lineno)s %(levelname)s:%(message)s",
+    level=getattr(logging, os.getenv("LOG_LEVEL", "DEBUG").upper()),
+    max_bytes=int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024)),
 )
 
 print("✅ Logging configured")
@@ -5,6 +5,12 @@ from google.adk.tools import google_search, AgentTool
 from dotenv import load_dotenv
 from typing import List
 import os
+import sys
+
+# Add repository root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from helper.llm_cache import LlmResponseCache, use_response_cache
+from helper.tool_memo import MemoizedFunctionTool
 
 load_dotenv()
 
@@ -39,6 +45,10 @@ def count_papers(papers: List[str]):
     return len(papers)
 
 
+# Pure function: identical paper lists are counted once for the whole app
+count_papers_tool = MemoizedFunctionTool(count_papers, scope="app", max_entries=256)
+
+
 # Google Search agent
 google_search_agent = LlmAgent(
     name="google_search_agent",
@@ -61,5 +71,14 @@ root_agent = LlmAgent(
     2) Then, pass the papers to 'count_papers' tool to count the number of papers returned.
     3) Return both the list of research papers and the total number of papers.
     """,
-    tools=[AgentTool(agent=google_search_agent), count_papers],
+    tools=[AgentTool(agent=google_search_agent), count_papers_tool],
 )
+
+# Optional on-disk response cache: LLM_CACHE=record reuses answers to identical
+# prompts, LLM_CACHE=replay fails instead of calling Gemini (for CI).
+if os.getenv("LLM_CACHE"):
+    use_response_cache(
+        root_agent,
+        LlmResponseCache(os.getenv("LLM_CACHE_PATH", "llm_cache.db")),
+        replay_only=os.getenv("LLM_CACHE") == "replay",
+    )
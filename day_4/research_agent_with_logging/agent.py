@@ -8,6 +8,13 @@ from google.adk.plugins import (
 from google.genai import types
 from dotenv import load_dotenv
 import asyncio
+import logging
+import os
+import sys
+
+# Add repository root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from helper.structured_logging import StructuredLoggingPlugin, start_json_logging
 
 load_dotenv()
 
@@ -56,12 +63,30 @@ root_agent = LlmAgent(
 )
 print("✅ Agent created")
 
-runner = InMemoryRunner(agent=root_agent, plugins=[LoggingPlugin()])
+# One JSON line per callback, written to LOG_FILE by a background thread.
+# LOG_LEVEL=DEBUG adds the per-event and per-request records, of which
+# LOG_EVENT_SAMPLE_RATE are kept. LOGGING_PLUGIN=console restores the
+# LoggingPlugin printout.
+if os.getenv("LOGGING_PLUGIN") == "console":
+    logging_plugin = LoggingPlugin()
+else:
+    logging_plugin = StructuredLoggingPlugin(
+        sample_rates={"on_event": float(os.getenv("LOG_EVENT_SAMPLE_RATE", "1.0"))}
+    )
+    # Only the plugin's logger: `adk web`/`adk run` keep their own handlers
+    start_json_logging(
+        filename=os.getenv("LOG_FILE", "agent_events.log"),
+        level=getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper()),
+        logger=logging_plugin.logger,
+    )
+
+runner = InMemoryRunner(agent=root_agent, plugins=[logging_plugin])
 print("✅ Runner configured")
 
 
-print("🚀 Running agent with LoggingPlugin...")
-print("📊 Watch the comprehensive logging output below:\n")
+print(f"🚀 Running agent with {type(logging_plugin).__name__}...")
+if isinstance(logging_plugin, LoggingPlugin):
+    print("📊 Watch the comprehensive logging output below:\n")
 
 
 async def main():
@@ -0,0 +1,313 @@
+from google.adk.events import Event
+from google.adk.sessions import DatabaseSessionService, Session
+from google.adk.sessions import _session_util
+from google.adk.sessions.base_session_service import BaseSessionService
+from google.adk.sessions.database_session_service import (
+    StorageAppState,
+    StorageEvent,
+    StorageSession,
+    StorageUserState,
+)
+from helper.session_events import place_compactions, restore_event_actions
+from sqlalchemy import event as sqlalchemy_event
+from sqlalchemy import func
+from sqlalchemy.exc import OperationalError
+from datetime import datetime
+import asyncio
+import atexit
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+# DatabaseSessionService commits every event in its own transaction, so many
+# chat sessions writing at once serialize on the SQLite lock. This variant
+# switches SQLite to WAL mode and writes the events of all sessions in one
+# transaction every `flush_interval` seconds.
+#
+# Durability window: events appended in the last `flush_interval` seconds are
+# lost if the process crashes. Pending events are flushed on close() and at
+# interpreter exit. A batch whose commit fails on the database itself (e.g.
+# "database is locked") stays pending for the next flush. Any other failure
+# is retried one event at a time, so one bad event (a duplicate id, an
+# unserializable action) cannot block the others; an event that still fails
+# after `max_write_attempts` flushes is moved to `quarantined`. Either way
+# the error is raised by the next append_event() or flush() so callers
+# notice.
+#
+# Like DatabaseSessionService.append_event, a write from a session object
+# older than the stored session raises ValueError ("stale session").
+
+
+def _set_wal_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    # WAL + NORMAL stays consistent after a crash and skips an fsync per commit
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+class BatchedDatabaseSessionService(DatabaseSessionService):
+    """DatabaseSessionService that groups event appends into batched commits.
+
+    Args:
+        db_url: Database URL, e.g. "sqlite:///my_agent_data.db".
+        flush_interval: Maximum seconds an appended event waits before it is
+                        committed (the durability window).
+        max_batch_size: Flush right away once this many events are pending.
+        max_write_attempts: Flushes an event may fail (other than on a locked
+                            or unreachable database) before it is dropped
+                            into `quarantined`.
+    """
+
+    def __init__(
+        self,
+        db_url: str,
+        flush_interval: float = 0.05,
+        max_batch_size: int = 500,
+        max_write_attempts: int = 3,
+        **kwargs,
+    ):
+        super().__init__(db_url, **kwargs)
+        if self.db_engine.dialect.name == "sqlite":
+            sqlalchemy_event.listen(self.db_engine, "connect", _set_wal_pragmas)
+            # Drop pooled connections opened before the listener was added
+            self.db_engine.dispose()
+
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self.max_write_attempts = max_write_attempts
+        self.flushed_events = 0
+        self.flush_count = 0
+        # (session, event, error) of events that could not be written
+        self.quarantined = []
+
+        self._pending = []
+        self._unflushed = {}  # (app_name, user_id, session_id) -> pending count
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._flush_task = None
+        self._flush_error = None
+        self._failed_attempts = {}  # event id -> failed flushes
+        atexit.register(self.flush_sync)
+
+    @staticmethod
+    def _key(session: Session):
+        return (session.app_name, session.user_id, session.id)
+
+    def _raise_flush_error(self) -> None:
+        # Report a failed background commit once; its batch is still pending
+        error, self._flush_error = self._flush_error, None
+        if error is not None:
+            raise error
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        self._raise_flush_error()
+
+        # Update the in-memory session now, persist it with the next batch
+        event = await BaseSessionService.append_event(self, session=session, event=event)
+        with self._pending_lock:
+            self._pending.append((session, event))
+            key = self._key(session)
+            self._unflushed[key] = self._unflushed.get(key, 0) + 1
+            pending = len(self._pending)
+
+        if pending >= self.max_batch_size:
+            await self.flush()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+        return event
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        try:
+            await self.flush()
+        except Exception as e:
+            # Nobody awaits this task; hand the error to the next caller
+            self._flush_error = e
+
+    async def flush(self) -> None:
+        """Commits every pending event, off the event loop thread."""
+        self._raise_flush_error()
+        if self._unflushed:
+            await asyncio.to_thread(self.flush_sync)
+
+    def flush_sync(self) -> None:
+        with self._write_lock:
+            with self._pending_lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return
+            try:
+                self._write_batch(batch)
+            except OperationalError:
+                # The database itself failed; the whole batch can be retried
+                self._requeue(batch)
+                logger.exception(
+                    "Failed to commit %d session events; they stay pending", len(batch)
+                )
+                raise
+            except Exception:
+                logger.exception(
+                    "Failed to commit %d session events; retrying one at a time",
+                    len(batch),
+                )
+                self._write_one_by_one(batch)
+            else:
+                self._mark_flushed(batch)
+
+    def _requeue(self, items) -> None:
+        # Back in front, in order, ahead of events appended meanwhile
+        with self._pending_lock:
+            self._pending = list(items) + self._pending
+
+    def _mark_flushed(self, items) -> None:
+        with self._pending_lock:
+            for session, _ in items:
+                key = self._key(session)
+                self._unflushed[key] -= 1
+                if not self._unflushed[key]:
+                    del self._unflushed[key]
+
+    def _write_one_by_one(self, batch) -> None:
+        retry = []
+        blocked = set()  # sessions whose earlier event is retried: keep order
+        error = None
+        for i, (session, event) in enumerate(batch):
+            key = self._key(session)
+            if key in blocked:
+                retry.append((session, event))
+                continue
+            try:
+                self._write_batch([(session, event)])
+            except OperationalError:
+                self._requeue(retry + batch[i:])
+                raise
+            except Exception as e:
+                error = e
+                attempts = self._failed_attempts.get(event.id, 0) + 1
+                if attempts < self.max_write_attempts:
+                    self._failed_attempts[event.id] = attempts
+                    retry.append((session, event))
+                    blocked.add(key)
+                    continue
+                self._failed_attempts.pop(event.id, None)
+                self.quarantined.append((session, event, e))
+                logger.error(
+                    "Dropped event %s of session %s after %d failed writes: %s",
+                    event.id,
+                    session.id,
+                    attempts,
+                    e,
+                )
+                self._mark_flushed([(session, event)])
+            else:
+                self._failed_attempts.pop(event.id, None)
+                self._mark_flushed([(session, event)])
+        self._requeue(retry)
+        if error is not None:
+            raise error
+
+    def _write_batch(self, batch) -> None:
+        with self.database_session_factory() as sql_session:
+            storage_sessions = {}
+            app_states = {}
+            user_states = {}
+
+            checked = {}  # id(session) -> session checked against storage
+
+            for session, event in batch:
+                key = self._key(session)
+                if key not in storage_sessions:
+                    storage_sessions[key] = sql_session.get(StorageSession, key)
+                storage_session = storage_sessions[key]
+                if storage_session is None:
+                    # The session was deleted before its events were flushed
+                    continue
+                if id(session) not in checked:
+                    # Same check as DatabaseSessionService.append_event
+                    if storage_session.update_timestamp_tz > session.last_update_time:
+                        raise ValueError(
+                            "The last_update_time provided in the session object"
+                            f" {datetime.fromtimestamp(session.last_update_time):'%Y-%m-%d %H:%M:%S'}"
+                            " is earlier than the update_time in the storage_session"
+                            f" {datetime.fromtimestamp(storage_session.update_timestamp_tz):'%Y-%m-%d %H:%M:%S'}."
+                            " Please check if it is a stale session."
+                        )
+                    checked[id(session)] = session
+                # Mark the row updated even without a state delta
+                storage_session.update_time = func.now()
+
+                if event.actions and event.actions.state_delta:
+                    state_deltas = _session_util.extract_state_delta(
+                        event.actions.state_delta
+                    )
+                    if state_deltas["app"]:
+                        if session.app_name not in app_states:
+                            app_states[session.app_name] = sql_session.get(
+                                StorageAppState, (session.app_name)
+                            )
+                        app_state = app_states[session.app_name]
+                        app_state.state = app_state.state | state_deltas["app"]
+                    if state_deltas["user"]:
+                        user_key = (session.app_name, session.user_id)
+                        if user_key not in user_states:
+                            user_states[user_key] = sql_session.get(
+                                StorageUserState, user_key
+                            )
+                        user_state = user_states[user_key]
+                        user_state.state = user_state.state | state_deltas["user"]
+                    if state_deltas["session"]:
+                        storage_session.state = (
+                            storage_session.state | state_deltas["session"]
+                        )
+
+                sql_session.add(StorageEvent.from_event(session, event))
+
+            sql_session.commit()
+
+            # Later writes from these session objects are checked against this
+            for session in checked.values():
+                storage_session = storage_sessions[self._key(session)]
+                sql_session.refresh(storage_session)
+                session.last_update_time = storage_session.update_timestamp_tz
+        self.flush_count += 1
+        self.flushed_events += len(batch)
+
+    async def _flush_if_pending(self, app_name: str, user_id: str, session_id: str):
+        # Read-your-writes: only wait when this session has unflushed events
+        if (app_name, user_id, session_id) in self._unflushed:
+            await asyncio.to_thread(self.flush_sync)
+
+    async def get_session(self, *, app_name, user_id, session_id, config=None):
+        await self._flush_if_pending(app_name, user_id, session_id)
+        session = await super().get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=config
+        )
+        if session:
+            # Compaction events would otherwise come back with dict actions
+            for event in session.events:
+                restore_event_actions(event)
+            # Compactions keeping a tail are listed before it, see
+            # TokenBudgetCompactionPlugin
+            session.events = place_compactions(session.events)
+        return session
+
+    async def list_sessions(self, *, app_name, user_id=None):
+        await self.flush()
+        return await super().list_sessions(app_name=app_name, user_id=user_id)
+
+    async def delete_session(self, app_name, user_id, session_id):
+        await self._flush_if_pending(app_name, user_id, session_id)
+        return await super().delete_session(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        )
+
+    async def close(self) -> None:
+        """Flushes pending events; call before shutting the service down."""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
@@ -0,0 +1,161 @@
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+from typing import Any, Optional
+import binascii
+import hashlib
+import logging
+import mmap
+import os
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+# MCP tools return images and blobs as base64 strings inside the function
+# response, and that string is kept in every event of the session (and in
+# every later prompt's history). spill_binary_content() decodes each blob
+# once, writes it to a content-addressed file and leaves only a small handle
+# in the response, so a session's memory no longer grows with its images.
+#
+# The spill directory is shared by every session, so it is capped instead:
+# at most every PRUNE_INTERVAL seconds, files unused for SPILL_MAX_AGE seconds
+# are deleted, then the least recently used ones until SPILL_MAX_BYTES is
+# met. Reusing a blob refreshes its mtime.
+
+SPILL_DIR = os.getenv("BLOB_SPILL_DIR") or os.path.join(tempfile.gettempdir(), "adk_blobs")
+SPILL_MAX_BYTES = int(os.getenv("BLOB_SPILL_MAX_BYTES", str(1024**3)))
+SPILL_MAX_AGE = float(os.getenv("BLOB_SPILL_MAX_AGE_S", str(7 * 24 * 3600)))
+PRUNE_INTERVAL = 60.0
+
+_prune_lock = threading.Lock()
+_pruned_at = 0.0
+
+_BINARY_TYPES = ("image", "audio", "blob")
+
+
+def _spill(data: str, mime_type: Optional[str]) -> dict:
+    raw = binascii.a2b_base64(data)
+    digest = hashlib.sha256(raw).hexdigest()
+    extension = (mime_type or "application/octet-stream").split("/")[-1]
+    path = os.path.join(SPILL_DIR, f"{digest}.{extension}")
+    # Content-addressed: the same image is stored once
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        os.makedirs(SPILL_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(raw)
+        os.replace(tmp_path, path)
+    _maybe_prune()
+    return {"sha256": digest, "path": path, "size_bytes": len(raw)}
+
+
+def _maybe_prune() -> None:
+    global _pruned_at
+    now = time.monotonic()
+    if now - _pruned_at < PRUNE_INTERVAL or not _prune_lock.acquire(blocking=False):
+        return
+    try:
+        _pruned_at = now
+        prune_spill_dir()
+    finally:
+        _prune_lock.release()
+
+
+def prune_spill_dir(
+    max_bytes: Optional[int] = None, max_age: Optional[float] = None
+) -> int:
+    """Deletes spilled blobs older than max_age, then LRU ones above max_bytes.
+
+    Defaults to SPILL_MAX_BYTES and SPILL_MAX_AGE. Returns the number of
+    files deleted.
+    """
+    max_bytes = SPILL_MAX_BYTES if max_bytes is None else max_bytes
+    max_age = SPILL_MAX_AGE if max_age is None else max_age
+    try:
+        entries = [e for e in os.scandir(SPILL_DIR) if e.is_file() and not e.name.endswith(".tmp")]
+    except FileNotFoundError:
+        return 0
+
+    files = []
+    for entry in entries:
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, entry.path))
+    files.sort()  # least recently used first
+
+    cutoff = time.time() - max_age
+    total = sum(size for _, size, _ in files)
+    deleted = 0
+    for mtime, size, path in files:
+        if mtime >= cutoff and total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        deleted += 1
+    if deleted:
+        logger.info("Pruned %d spilled blobs from %s", deleted, SPILL_DIR)
+    return deleted
+
+
+def spill_binary_content(
+    tool: BaseTool, args: dict[str, Any], tool_context: ToolContext, tool_response: Any
+) -> Optional[dict]:
+    """after_tool_callback that replaces base64 payloads with file handles.
+
+    Image, audio and embedded blob items keep their type and mimeType; "data"
+    (or "blob") is replaced by {"sha256", "path", "size_bytes"}.
+    """
+    if not isinstance(tool_response, dict):
+        return None
+    items = tool_response.get("content")
+    if not isinstance(items, list):
+        return None
+
+    changed = False
+    new_items = []
+    for item in items:
+        if not isinstance(item, dict):
+            new_items.append(item)
+            continue
+        if item.get("type") in _BINARY_TYPES and isinstance(item.get("data"), str):
+            handle = _spill(item["data"], item.get("mimeType"))
+            item = {key: value for key, value in item.items() if key != "data"}
+            item["handle"] = handle
+            changed = True
+        elif item.get("type") == "resource" and isinstance(
+            (item.get("resource") or {}).get("blob"), str
+        ):
+            resource = dict(item["resource"])
+            resource["handle"] = _spill(resource.pop("blob"), resource.get("mimeType"))
+            item = {**item, "resource": resource}
+            changed = True
+        new_items.append(item)
+
+    if not changed:
+        return None
+    return {**tool_response, "content": new_items}
+
+
+def open_blob(handle: dict) -> memoryview:
+    """Maps a spilled blob into memory without copying it.
+
+    Handles are not permanent: a blob unused for SPILL_MAX_AGE seconds, or
+    evicted to keep the directory under SPILL_MAX_BYTES, raises
+    FileNotFoundError. Copy it elsewhere if it must outlive that.
+    """
+    with open(handle["path"], "rb") as f:
+        if handle.get("size_bytes") == 0:
+            return memoryview(b"")
+        return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+print("✅ Binary spill callback defined.")
@@ -0,0 +1,159 @@
+from google.adk.agents import LoopAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.loop_agent import LoopAgentState
+from google.adk.events import Event, EventActions
+from google.adk.utils.context_utils import Aclosing
+from typing import AsyncGenerator, Callable, Optional
+import difflib
+
+
+def state_equals(key: str, value: str) -> Callable[[dict], bool]:
+    """Exit condition: state[key] is `value`, ignoring case, spaces and a final period.
+
+    e.g. state_equals("critique", "APPROVED") also accepts "Approved." from
+    the critic.
+    """
+
+    def normalize(text) -> str:
+        return str(text).strip().rstrip(".!").strip().upper()
+
+    expected = normalize(value)
+
+    def condition(state: dict) -> bool:
+        return key in state and normalize(state[key]) == expected
+
+    condition.__name__ = f"{key} == {value!r}"
+    return condition
+
+
+def text_similarity(a: str, b: str) -> float:
+    """difflib ratio of two texts (1.0 means identical)."""
+    matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    # quick_ratio() is an upper bound; skip the full diff when it is low
+    if matcher.quick_ratio() < 0.5:
+        return matcher.quick_ratio()
+    return matcher.ratio()
+
+
+class ConvergingLoopAgent(LoopAgent):
+    """LoopAgent that can stop without another model call.
+
+    After each sub-agent finishes, the loop stops if any exit condition holds
+    on the session state, or if the sub-agent rewrote `convergence_key` into
+    a text at least `similarity_threshold` similar to the previous version.
+    e.g. stopping as soon as the critic writes "APPROVED" skips the refiner
+    call that would only have called exit_loop.
+
+    Sub-agents can still end the loop by escalating (exit_loop), and
+    max_iterations still applies.
+
+    Attributes:
+        exit_conditions: Callables taking the session state and returning True
+                         to stop the loop.
+        convergence_key: State key of the text being refined.
+        similarity_threshold: Similarity (0-1) between two successive versions
+                              of convergence_key at which the loop stops.
+        exit_reason_key: State key recording why the loop stopped.
+
+    LoopAgent has no hook for its exit check, so _run_async_impl is a copy of
+    google.adk.agents.loop_agent.LoopAgent._run_async_impl, resumability
+    handling included. The only additions are marked "Not in LoopAgent";
+    diff the rest against upstream when upgrading ADK.
+    """
+
+    exit_conditions: list[Callable[[dict], bool]] = []
+    convergence_key: Optional[str] = None
+    similarity_threshold: float = 0.97
+    exit_reason_key: str = "loop_exit_reason"
+
+    def _exit_reason(self, state, previous_text) -> Optional[str]:
+        for condition in self.exit_conditions:
+            if condition(state):
+                return f"condition {getattr(condition, '__name__', repr(condition))}"
+
+        if self.convergence_key and previous_text is not None:
+            text = state.get(self.convergence_key)
+            if isinstance(text, str) and text != previous_text:
+                similarity = text_similarity(previous_text, text)
+                if similarity >= self.similarity_threshold:
+                    return f"{self.convergence_key} converged (similarity {similarity:.2f})"
+        return None
+
+    def _exit_event(self, ctx: InvocationContext, reason: str) -> Event:
+        # Not an escalation: that would also end any enclosing loop
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={self.exit_reason_key: reason}),
+        )
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        if not self.sub_agents:
+            return
+
+        # Copy of LoopAgent._run_async_impl (see the class docstring)
+        agent_state = self._load_agent_state(ctx, LoopAgentState)
+        is_resuming_at_current_agent = agent_state is not None
+        times_looped, start_index = self._get_start_state(agent_state)
+
+        should_exit = False
+        pause_invocation = False
+        while (
+            not self.max_iterations or times_looped < self.max_iterations
+        ) and not (should_exit or pause_invocation):
+            for i in range(start_index, len(self.sub_agents)):
+                sub_agent = self.sub_agents[i]
+
+                if ctx.is_resumable and not is_resuming_at_current_agent:
+                    ctx.set_agent_state(
+                        self.name,
+                        agent_state=LoopAgentState(
+                            current_sub_agent=sub_agent.name,
+                            times_looped=times_looped,
+                        ),
+                    )
+                    yield self._create_agent_state_event(ctx)
+
+                is_resuming_at_current_agent = False
+
+                # Not in LoopAgent: remember the text to detect convergence
+                previous_text = None
+                if self.convergence_key:
+                    previous_text = ctx.session.state.get(self.convergence_key)
+                    if not isinstance(previous_text, str):
+                        previous_text = None
+
+                async with Aclosing(sub_agent.run_async(ctx)) as agen:
+                    async for event in agen:
+                        yield event
+                        if event.actions.escalate:
+                            should_exit = True
+                        if ctx.should_pause_invocation(event):
+                            pause_invocation = True
+
+                if should_exit or pause_invocation:
+                    break
+
+                # Not in LoopAgent: the exit checks
+                reason = self._exit_reason(ctx.session.state, previous_text)
+                if reason is not None:
+                    should_exit = True
+                    yield self._exit_event(ctx, reason)
+                    break
+
+            start_index = 0
+            times_looped += 1
+            ctx.reset_sub_agent_states(self.name)
+
+        if pause_invocation:
+            return
+
+        if ctx.is_resumable:
+            ctx.set_agent_state(self.name, end_of_agent=True)
+            yield self._create_agent_state_event(ctx)
+
+
+print("✅ Converging loop agent defined.")
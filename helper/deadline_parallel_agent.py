@@ -0,0 +1,146 @@
+from google.adk.agents import ParallelAgent
+from google.adk.agents.base_agent import BaseAgentState
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.parallel_agent import _create_branch_ctx_for_sub_agent
+from google.adk.events import Event, EventActions
+from typing import AsyncGenerator, Optional
+import asyncio
+
+
+class DeadlineParallelAgent(ParallelAgent):
+    """ParallelAgent that stops waiting for slow branches.
+
+    The agents after it (e.g. the aggregator) run with whatever output_key
+    values are present. Branches that did not finish get `missing_value`
+    written to their output_key, so `{placeholder}` instructions still render,
+    and their names are listed in state under `missing_branches_key`.
+
+    Attributes:
+        branch_timeout: Seconds the branches get before unfinished ones are
+                        dropped. None waits for every branch.
+        quorum: Minimum number of branches that must finish. Without a
+                timeout the agent moves on as soon as the quorum is reached;
+                with a timeout, the deadline never cuts below the quorum.
+        missing_value: Text stored for branches that were dropped.
+        missing_branches_key: State key listing the dropped branches.
+
+    _run_async_impl mirrors google.adk.agents.parallel_agent.ParallelAgent's,
+    including its resumability bookkeeping (agent state and end_of_agent
+    events, skipping branches that finished before a pause). Keep the two in
+    step when upgrading ADK. A dropped branch counts as finished once its
+    missing_value is written, so a resumed invocation does not rerun it.
+    """
+
+    branch_timeout: Optional[float] = None
+    quorum: Optional[int] = None
+    missing_value: str = "(No result: this branch did not finish in time.)"
+    missing_branches_key: str = "missing_branches"
+
+    def _done_waiting(self, finished: int, deadline_passed: bool) -> bool:
+        if finished == len(self.sub_agents):
+            return True
+        if self.quorum and self.branch_timeout is None:
+            return finished >= self.quorum
+        return deadline_passed and finished >= (self.quorum or 0)
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        if not self.sub_agents:
+            return
+
+        agent_state = self._load_agent_state(ctx, BaseAgentState)
+        if ctx.is_resumable and not agent_state:
+            ctx.set_agent_state(self.name, agent_state=BaseAgentState())
+            yield self._create_agent_state_event(ctx)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.branch_timeout if self.branch_timeout else None
+        queue = asyncio.Queue()
+        done = object()
+
+        # Same hand-off as ParallelAgent: a branch waits until the runner has
+        # processed its event before producing the next one.
+        async def run_branch(name, events_for_one_agent):
+            try:
+                async for event in events_for_one_agent:
+                    resume_signal = asyncio.Event()
+                    await queue.put((name, event, resume_signal))
+                    await resume_signal.wait()
+            except Exception as e:
+                await queue.put((name, e, None))
+                return
+            await queue.put((name, done, None))
+
+        agent_runs = {}
+        tasks = {}
+        # Branches that finished before the invocation paused are not rerun
+        finished = {
+            sub_agent.name
+            for sub_agent in self.sub_agents
+            if ctx.end_of_agents.get(sub_agent.name)
+        }
+        for sub_agent in self.sub_agents:
+            if sub_agent.name in finished:
+                continue
+            sub_agent_ctx = _create_branch_ctx_for_sub_agent(self, sub_agent, ctx)
+            agent_runs[sub_agent.name] = sub_agent.run_async(sub_agent_ctx)
+            tasks[sub_agent.name] = asyncio.create_task(
+                run_branch(sub_agent.name, agent_runs[sub_agent.name])
+            )
+
+        pause_invocation = False
+        try:
+            while True:
+                deadline_passed = deadline is not None and loop.time() >= deadline
+                if self._done_waiting(len(finished), deadline_passed):
+                    break
+
+                timeout = None
+                if deadline is not None and not deadline_passed:
+                    timeout = deadline - loop.time()
+                try:
+                    name, event, resume_signal = await asyncio.wait_for(
+                        queue.get(), timeout
+                    )
+                except asyncio.TimeoutError:
+                    continue
+
+                if event is done:
+                    finished.add(name)
+                elif isinstance(event, Exception):
+                    raise event
+                else:
+                    yield event
+                    resume_signal.set()
+                    if ctx.should_pause_invocation(event):
+                        pause_invocation = True
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            for agent_run in agent_runs.values():
+                await agent_run.aclose()
+
+        if pause_invocation:
+            # The paused branch resumes later; dropping it now would lose it
+            return
+
+        missing = [agent.name for agent in self.sub_agents if agent.name not in finished]
+        # Also clear a list left over from an earlier turn
+        if missing or ctx.session.state.get(self.missing_branches_key):
+            state_delta = {self.missing_branches_key: missing}
+            for agent in self.sub_agents:
+                output_key = getattr(agent, "output_key", None)
+                if agent.name in missing and output_key:
+                    state_delta[output_key] = self.missing_value
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                actions=EventActions(state_delta=state_delta),
+            )
+
+        if ctx.is_resumable:
+            ctx.set_agent_state(self.name, end_of_agent=True)
+            yield self._create_agent_state_event(ctx)
@@ -0,0 +1,261 @@
+from google.adk.agents import LlmAgent
+from google.adk.apps.app import App
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import errors, types
+from helper.token_estimator import estimate_content_tokens, estimate_request_tokens
+from pydantic import Field, PrivateAttr
+from typing import Any, Callable, Optional
+import asyncio
+import json
+import random
+import time
+
+
+# Offline stand-in for Gemini(...). It replays scripted or recorded responses
+# so every agent in the repo can run (and be benchmarked) without the network.
+#
+# A script step can be:
+#   "some text"                                      -> a plain text answer
+#   {"text": "..."}                                  -> same as above
+#   {"function_call": {"name": "exit_loop", "args": {}}}
+#   {"function_calls": [{"name": ..., "args": ...}, ...]}
+#   {"error": 429}                                   -> raise that API error
+#   types.Content / LlmResponse                      -> returned as-is
+#   a callable(llm_request)                          -> returns any of the above
+
+
+def _error_for_code(code: int) -> errors.APIError:
+    status = {429: "RESOURCE_EXHAUSTED", 503: "UNAVAILABLE"}.get(code, "INTERNAL")
+    response_json = {
+        "error": {"code": code, "message": "Injected by FakeGemini", "status": status}
+    }
+    if code < 500:
+        return errors.ClientError(code, response_json)
+    return errors.ServerError(code, response_json)
+
+
+class FakeGemini(BaseLlm):
+    """Deterministic, offline drop-in replacement for Gemini.
+
+    Attributes:
+        responses: Scripted steps, consumed one per model call.
+        responder: Optional callable(llm_request) used instead of the script.
+        default_response: Returned once the script is exhausted.
+        cycle: Restart the script from the top instead of using the default.
+        latency: Base latency of every call, in seconds.
+        jitter: Extra random latency in [0, jitter] seconds.
+        error_rate: Probability of failing a call with one of `error_codes`.
+        error_codes: HTTP codes used for injected errors.
+        retry_options: Same retry options as Gemini; injected errors with a
+                       retryable code are retried with exponential backoff.
+        seed: Seed for jitter and error injection.
+    """
+
+    model: str = "gemini-2.5-flash-lite"
+    responses: list[Any] = Field(default_factory=list)
+    responder: Optional[Callable[[LlmRequest], Any]] = None
+    default_response: Any = "OK"
+    cycle: bool = False
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_codes: list[int] = Field(default_factory=lambda: [429, 503])
+    retry_options: Optional[types.HttpRetryOptions] = None
+    stream_chunks: int = 4
+    seed: int = 0
+
+    call_count: int = 0
+    error_count: int = 0
+    max_in_flight: int = 0
+    total_latency_s: float = 0.0
+
+    _rng: random.Random = PrivateAttr()
+    _cursor: int = PrivateAttr(default=0)
+    _in_flight: int = PrivateAttr(default=0)
+
+    def model_post_init(self, __context):
+        self._rng = random.Random(self.seed)
+
+    @classmethod
+    def from_jsonl(cls, path: str, **kwargs) -> "FakeGemini":
+        """Builds a FakeGemini from a JSONL file of recorded responses.
+
+        Each line is either a script step (see above) or an LlmResponse dumped
+        with `model_dump_json()`.
+        """
+        responses = []
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                step = json.loads(line)
+                if isinstance(step, dict) and "content" in step:
+                    step = LlmResponse.model_validate(step)
+                responses.append(step)
+        return cls(responses=responses, **kwargs)
+
+    def _next_step(self, llm_request: LlmRequest):
+        if self.responder:
+            return self.responder(llm_request)
+        if self._cursor >= len(self.responses):
+            if not (self.cycle and self.responses):
+                return self.default_response
+            self._cursor = 0
+        step = self.responses[self._cursor]
+        self._cursor += 1
+        return step(llm_request) if callable(step) else step
+
+    def _to_response(self, step, llm_request: LlmRequest) -> LlmResponse:
+        if isinstance(step, LlmResponse):
+            return step.model_copy(deep=True)
+        if isinstance(step, types.Content):
+            content = step.model_copy(deep=True)
+        elif isinstance(step, str):
+            content = types.Content(role="model", parts=[types.Part(text=step)])
+        elif isinstance(step, dict):
+            if "error" in step:
+                raise _error_for_code(step["error"])
+            calls = step.get("function_calls") or []
+            if "function_call" in step:
+                calls = [step["function_call"]]
+            parts = []
+            if step.get("text"):
+                parts.append(types.Part(text=step["text"]))
+            for call in calls:
+                parts.append(
+                    types.Part(
+                        function_call=types.FunctionCall(
+                            name=call["name"], args=call.get("args", {})
+                        )
+                    )
+                )
+            content = types.Content(role="model", parts=parts)
+        else:
+            raise TypeError(f"Unsupported FakeGemini script step: {step!r}")
+
+        prompt_tokens = estimate_request_tokens(llm_request)
+        output_tokens = estimate_content_tokens(content)
+        return LlmResponse(
+            content=content,
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=output_tokens,
+                total_token_count=prompt_tokens + output_tokens,
+            ),
+        )
+
+    async def _call_once(self, llm_request: LlmRequest) -> LlmResponse:
+        delay = self.latency + self._rng.uniform(0, self.jitter)
+        if self.error_codes and self._rng.random() < self.error_rate:
+            self.error_count += 1
+            raise _error_for_code(self._rng.choice(self.error_codes))
+        if delay:
+            await asyncio.sleep(delay)
+        return self._to_response(self._next_step(llm_request), llm_request)
+
+    async def _call_with_retries(self, llm_request: LlmRequest) -> LlmResponse:
+        options = self.retry_options or types.HttpRetryOptions(attempts=1)
+        attempts = options.attempts or 1
+        retry_codes = options.http_status_codes or []
+        for attempt in range(1, attempts + 1):
+            try:
+                return await self._call_once(llm_request)
+            except errors.APIError as e:
+                if attempt == attempts or e.code not in retry_codes:
+                    raise
+                # Same shape as the google-genai backoff: initial * base^(n-1)
+                backoff = (options.initial_delay or 1.0) * (
+                    (options.exp_base or 2) ** (attempt - 1)
+                )
+                await asyncio.sleep(min(backoff, options.max_delay or 60.0))
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ):
+        self._maybe_append_user_content(llm_request)
+        self.call_count += 1
+        self._in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        start = time.perf_counter()
+        try:
+            llm_response = await self._call_with_retries(llm_request)
+        finally:
+            self._in_flight -= 1
+            self.total_latency_s += time.perf_counter() - start
+
+        parts = llm_response.content.parts if llm_response.content else []
+        text = "".join(part.text or "" for part in parts or [])
+        if stream and text and self.stream_chunks > 1:
+            # Emit partial text deltas first, like Gemini's SSE stream does
+            size = max(1, -(-len(text) // self.stream_chunks))
+            for i in range(0, len(text), size):
+                yield LlmResponse(
+                    content=types.Content(
+                        role="model", parts=[types.Part(text=text[i : i + size])]
+                    ),
+                    partial=True,
+                )
+                await asyncio.sleep(0)
+        yield llm_response
+
+
+def replace_models(agent_or_app, factory: Callable[[LlmAgent], BaseLlm]) -> dict:
+    """Swaps the model of every LlmAgent in an agent tree.
+
+    Sub-agents and agents wrapped in AgentTool are both visited.
+
+    Args:
+        agent_or_app: Root agent or App to patch in place.
+        factory: Called with each LlmAgent, returns the model to use for it.
+
+    Returns:
+        Dictionary mapping agent name to its new model.
+    """
+    root = agent_or_app.root_agent if isinstance(agent_or_app, App) else agent_or_app
+    models = {}
+    seen = set()
+    pending = [root]
+    while pending:
+        agent = pending.pop()
+        if id(agent) in seen:
+            continue
+        seen.add(id(agent))
+        if isinstance(agent, LlmAgent):
+            agent.model = factory(agent)
+            models[agent.name] = agent.model
+            pending.extend(
+                tool.agent for tool in agent.tools if isinstance(tool, AgentTool)
+            )
+        pending.extend(agent.sub_agents)
+    return models
+
+
+def use_fake_models(agent_or_app, scripts: dict = None, **kwargs) -> dict:
+    """Points every LlmAgent in the tree at its own FakeGemini.
+
+    Args:
+        agent_or_app: Root agent or App to patch in place.
+        scripts: Optional mapping of agent name to its list of script steps.
+        **kwargs: Passed to every FakeGemini (latency, jitter, error_rate, ...).
+
+    Returns:
+        Dictionary mapping agent name to its FakeGemini, handy for reading
+        call counts after a run.
+    """
+    scripts = scripts or {}
+
+    def make_fake(agent):
+        # Keep the agent's retry policy so injected 429/503s behave the same
+        retry_options = getattr(agent.model, "retry_options", None)
+        return FakeGemini(
+            responses=list(scripts.get(agent.name, [])),
+            **{"retry_options": retry_options, **kwargs},
+        )
+
+    return replace_models(agent_or_app, make_fake)
+
+
+print("✅ Fake Gemini backend defined.")
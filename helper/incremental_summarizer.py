@@ -0,0 +1,228 @@
+from google.adk.apps.llm_event_summarizer import LlmEventSummarizer
+from google.adk.events import Event, EventActions
+from google.adk.events.event_actions import EventCompaction
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.genai.types import Content, Part
+from helper.token_estimator import estimate_text_tokens
+from collections import OrderedDict
+from typing import Callable, Optional
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+# The Runner already starts compaction with asyncio.create_task() once a turn
+# has been yielded, but every compaction re-summarizes the `overlap_size`
+# invocations that the previous summary already covers, and nothing bounds
+# how many summaries run at once or waits for them before the process exits.
+#
+# IncrementalEventsSummarizer keeps the last summary of each conversation,
+# summarizes only the events that summary does not cover (passing it along as
+# context) and emits a compaction that starts right after the previous one.
+# ADK puts every compaction event in the prompt, so the summaries chain
+# without repeating the overlap.
+#
+# When turns finish faster than a summary, the Runner starts another
+# compaction of the same range before the first one is appended. Those wait
+# for the running one and then summarize only what it did not cover.
+
+_INCREMENTAL_PROMPT_TEMPLATE = (
+    "The following is the summary of an earlier part of a conversation between"
+    " a user and an AI agent, followed by the messages that came after it."
+    " Summarize only the new messages, focusing on key information and"
+    " decisions made, as well as any unresolved questions or tasks. Use the"
+    " earlier summary only to resolve references; do not repeat it.\n\n"
+    "Earlier summary:\n{previous_summary}\n\n"
+    "New messages:\n{conversation_history}"
+)
+
+
+def _content_text(content: Optional[Content]) -> str:
+    if not content or not content.parts:
+        return ""
+    return "\n".join(part.text for part in content.parts if part.text)
+
+
+class IncrementalEventsSummarizer(LlmEventSummarizer):
+    """LlmEventSummarizer that extends the previous summary instead of redoing it.
+
+    Args:
+        llm: The LLM used for summarization.
+        prompt_template: Prompt for the first summary of a conversation, with a
+                         '{conversation_history}' placeholder.
+        incremental_prompt_template: Prompt for later summaries, with
+                                     '{previous_summary}' and
+                                     '{conversation_history}' placeholders.
+        max_concurrency: Maximum number of summaries generated at once across
+                         all sessions.
+        max_tracked_summaries: Number of conversations whose last summary is
+                               kept in memory (least recently used are dropped).
+        on_compaction: Callbacks called with a stats dict after each compaction.
+    """
+
+    def __init__(
+        self,
+        llm: BaseLlm,
+        prompt_template: Optional[str] = None,
+        incremental_prompt_template: Optional[str] = None,
+        max_concurrency: int = 4,
+        max_tracked_summaries: int = 1000,
+        on_compaction: Optional[list[Callable[[dict], None]]] = None,
+    ):
+        super().__init__(llm=llm, prompt_template=prompt_template)
+        self._incremental_prompt_template = (
+            incremental_prompt_template or _INCREMENTAL_PROMPT_TEMPLATE
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._max_tracked_summaries = max_tracked_summaries
+        # id of the last event a summary covers -> summary text
+        self._summaries = OrderedDict()
+        # id of the first event of a range -> [lock, number of users]
+        self._range_locks = {}
+        self._in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        # Tasks that asked for a summary and may still append it
+        self._callers = set()
+
+        self.on_compaction = list(on_compaction or [])
+        self.compactions = 0
+        self.total_tokens_saved = 0
+
+    def _split_covered(self, events: list[Event]):
+        # Events up to the last one a known summary ends with are the overlap
+        for i in range(len(events) - 1, -1, -1):
+            previous_summary = self._summaries.get(events[i].id)
+            if previous_summary is not None:
+                self._summaries.move_to_end(events[i].id)
+                return previous_summary, events[i + 1 :]
+        return None, events
+
+    def _remember(self, last_event_id: str, summary: str):
+        self._summaries[last_event_id] = summary
+        while len(self._summaries) > self._max_tracked_summaries:
+            self._summaries.popitem(last=False)
+
+    async def _generate(self, prompt: str) -> Optional[Content]:
+        llm_request = LlmRequest(
+            model=self._llm.model,
+            contents=[Content(role="user", parts=[Part(text=prompt)])],
+        )
+        async for llm_response in self._llm.generate_content_async(
+            llm_request, stream=False
+        ):
+            if llm_response.content:
+                return llm_response.content
+        return None
+
+    async def maybe_summarize_events(self, *, events: list[Event]) -> Optional[Event]:
+        if not events:
+            return None
+
+        # Ranges of one conversation start with the same event until a
+        # compaction has been appended
+        key = events[0].id
+        caller = asyncio.current_task()
+        if caller is not None and caller not in self._callers:
+            self._callers.add(caller)
+            caller.add_done_callback(self._callers.discard)
+        range_lock = self._range_locks.setdefault(key, [asyncio.Lock(), 0])
+        range_lock[1] += 1
+        self._in_flight += 1
+        self._idle.clear()
+        try:
+            async with range_lock[0], self._semaphore:
+                return await self._summarize(events)
+        finally:
+            range_lock[1] -= 1
+            if not range_lock[1]:
+                del self._range_locks[key]
+            self._in_flight -= 1
+            if not self._in_flight:
+                self._idle.set()
+
+    async def _summarize(self, events: list[Event]) -> Optional[Event]:
+        start = time.perf_counter()
+        previous_summary, new_events = self._split_covered(events)
+        if not new_events:
+            return None
+
+        conversation_history = self._format_events_for_prompt(new_events)
+        if previous_summary is None:
+            prompt = self._prompt_template.format(
+                conversation_history=conversation_history
+            )
+        else:
+            prompt = self._incremental_prompt_template.format(
+                previous_summary=previous_summary,
+                conversation_history=conversation_history,
+            )
+
+        summary_content = await self._generate(prompt)
+        if summary_content is None:
+            return None
+        summary_content.role = "model"
+        summary = _content_text(summary_content)
+        self._remember(new_events[-1].id, summary)
+
+        compaction_event = Event(
+            author="user",
+            actions=EventActions(
+                compaction=EventCompaction(
+                    start_timestamp=new_events[0].timestamp,
+                    end_timestamp=new_events[-1].timestamp,
+                    compacted_content=summary_content,
+                )
+            ),
+            invocation_id=Event.new_id(),
+        )
+
+        tokens_before = estimate_text_tokens(conversation_history)
+        tokens_after = estimate_text_tokens(summary)
+        self.compactions += 1
+        self.total_tokens_saved += tokens_before - tokens_after
+        stats = {
+            "events": len(new_events),
+            "overlap_events_skipped": len(events) - len(new_events),
+            "incremental": previous_summary is not None,
+            "tokens_before": tokens_before,
+            "tokens_after": tokens_after,
+            "tokens_saved": tokens_before - tokens_after,
+            "latency_s": time.perf_counter() - start,
+        }
+        for callback in self.on_compaction:
+            try:
+                callback(stats)
+            except Exception:
+                logger.exception("on_compaction callback failed")
+        return compaction_event
+
+    async def wait_idle(self) -> None:
+        """Waits for running compactions, including appending their events.
+
+        Call it before the event loop ends, otherwise asyncio.run() cancels
+        the compaction tasks the Runner started in the background.
+        """
+        await self._idle.wait()
+        # The tasks that called maybe_summarize_events() (e.g. the Runner's
+        # background compaction) append the returned event afterwards
+        current = asyncio.current_task()
+        callers = [task for task in self._callers if task is not current]
+        await asyncio.gather(*callers, return_exceptions=True)
+
+
+def print_compaction_stats(stats: dict) -> None:
+    """on_compaction hook that prints how many tokens a compaction saved."""
+    mode = "incremental" if stats["incremental"] else "full"
+    print(
+        f"🗜️  Compacted {stats['events']} events ({mode}, "
+        f"{stats['overlap_events_skipped']} overlap skipped): "
+        f"~{stats['tokens_before']} -> ~{stats['tokens_after']} tokens, "
+        f"saved ~{stats['tokens_saved']} in {stats['latency_s']:.2f}s"
+    )
+
+
+print("✅ Incremental events summarizer defined.")
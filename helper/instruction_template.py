@@ -0,0 +1,161 @@
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.utils.instructions_utils import _is_valid_state_name, inject_session_state
+from helper.token_estimator import estimate_text_tokens
+from collections import OrderedDict
+from typing import Optional
+import re
+
+
+# Compiled `{placeholder}` instructions.
+#
+# A string instruction is parsed and filled in from session state on every
+# model call, huge state values included. CompiledInstruction parses the
+# template once and, as an InstructionProvider, re-renders it for a session
+# only when one of the state values it references has changed. It also keeps
+# the size of every injected value, to show which key bloats the prompts.
+#
+# Placeholders behave like ADK's: {key} fails if the key is missing, {key?}
+# renders as "", None renders as "", and anything that is not a valid state
+# name is left as is. Templates with {artifact.name} placeholders are
+# rendered by ADK itself on every call (loading an artifact is async I/O).
+
+_PLACEHOLDER = re.compile(r"{+[^{}]*}+")
+
+# Values compared by equality; others (lists, dicts...) may change in place
+_IMMUTABLE = (str, int, float, bool, type(None))
+
+_registry = []
+
+
+class CompiledInstruction:
+    """InstructionProvider rendering a pre-parsed `{placeholder}` template.
+
+    Args:
+        template: The instruction, with the same placeholders as a string
+                  instruction.
+        max_sessions: Number of sessions whose rendered text is kept (LRU).
+    """
+
+    def __init__(self, template: str, max_sessions: int = 1024):
+        self.template = template
+        self.max_sessions = max_sessions
+        self.has_artifacts = False
+        # Literal strings and (key, optional) placeholders, in order
+        self.segments = []
+        last_end = 0
+        for match in _PLACEHOLDER.finditer(template):
+            self.segments.append(template[last_end : match.start()])
+            name = match.group().lstrip("{").rstrip("}").strip()
+            optional = name.endswith("?")
+            key = name.removesuffix("?")
+            if key.startswith("artifact."):
+                self.has_artifacts = True
+                self.segments.append(match.group())
+            elif _is_valid_state_name(key):
+                self.segments.append((key, optional))
+            else:
+                self.segments.append(match.group())
+            last_end = match.end()
+        self.segments.append(template[last_end:])
+        self.keys = list(dict.fromkeys(s[0] for s in self.segments if isinstance(s, tuple)))
+
+        self._rendered = OrderedDict()
+        self.stats = {"renders": 0, "cache_hits": 0}
+        self.key_sizes = {key: {"chars": 0, "max_chars": 0, "tokens": 0} for key in self.keys}
+        _registry.append(self)
+
+    def _unchanged(self, previous: tuple, current: tuple) -> bool:
+        for old, new in zip(previous, current):
+            if old is new:
+                continue
+            if isinstance(new, _IMMUTABLE) and type(old) is type(new) and old == new:
+                continue
+            return False
+        # Same objects, but a mutable value may have been changed in place
+        return all(isinstance(value, _IMMUTABLE) for value in current)
+
+    def render(self, state) -> str:
+        """Fills the template from a state mapping (no caching)."""
+        parts = []
+        for segment in self.segments:
+            if isinstance(segment, str):
+                parts.append(segment)
+                continue
+            key, optional = segment
+            if key not in state:
+                if optional:
+                    parts.append("")
+                    continue
+                raise KeyError(f"Context variable not found: `{key}`.")
+            value = state[key]
+            parts.append("" if value is None else str(value))
+        return "".join(parts)
+
+    def _track_sizes(self, state):
+        for key in self.keys:
+            value = state.get(key)
+            text = "" if value is None else str(value)
+            sizes = self.key_sizes[key]
+            sizes["chars"] = len(text)
+            sizes["max_chars"] = max(sizes["max_chars"], len(text))
+            sizes["tokens"] = estimate_text_tokens(text)
+
+    def __call__(self, readonly_context: ReadonlyContext):
+        if self.has_artifacts:
+            return inject_session_state(self.template, readonly_context)
+
+        state = readonly_context.state
+        session = readonly_context.session
+        session_key = (session.app_name, session.user_id, session.id)
+        values = tuple(state.get(key) for key in self.keys)
+        # A key that appears later with a None value must still re-render
+        present = tuple(key in state for key in self.keys)
+
+        cached = self._rendered.get(session_key)
+        if cached is not None:
+            cached_present, cached_values, text = cached
+            if cached_present == present and self._unchanged(cached_values, values):
+                self._rendered.move_to_end(session_key)
+                self.stats["cache_hits"] += 1
+                return text
+
+        text = self.render(state)
+        self.stats["renders"] += 1
+        self._track_sizes(state)
+        self._rendered[session_key] = (present, values, text)
+        self._rendered.move_to_end(session_key)
+        while len(self._rendered) > self.max_sessions:
+            self._rendered.popitem(last=False)
+        return text
+
+
+def compile_instruction(template: str, **kwargs) -> CompiledInstruction:
+    """Compiles an instruction template; pass it as an agent's instruction."""
+    return CompiledInstruction(template, **kwargs)
+
+
+def instruction_metrics() -> dict:
+    """Render counts and the latest size of each injected key, per template."""
+    metrics = {}
+    for i, instruction in enumerate(_registry):
+        key_sizes = {key: dict(sizes) for key, sizes in instruction.key_sizes.items()}
+        name = ",".join(instruction.keys) or f"template_{i}"
+        metrics[name] = {**instruction.stats, "keys": key_sizes}
+    return metrics
+
+
+def print_instruction_metrics(top: Optional[int] = None):
+    """Prints the injected state keys, largest first."""
+    rows = []
+    for instruction in _registry:
+        for key, sizes in instruction.key_sizes.items():
+            rows.append((sizes["tokens"], key, sizes, instruction.stats))
+    rows.sort(key=lambda row: row[0], reverse=True)
+    for tokens, key, sizes, stats in rows[:top]:
+        print(
+            f"🧩 {{{key}}}: ~{tokens} tokens ({sizes['chars']} chars, max {sizes['max_chars']}),"
+            f" {stats['renders']} renders, {stats['cache_hits']} cache hits"
+        )
+
+
+print("✅ Compiled instruction templates defined.")
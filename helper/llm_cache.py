@@ -0,0 +1,251 @@
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from helper.fake_llm import replace_models
+from pydantic import PrivateAttr
+from typing import Optional
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+# Persistent record/replay cache for model calls.
+# Identical prompts (same model, system instruction, tool declarations and
+# contents) are answered from a local SQLite file instead of the API.
+
+
+class CacheMissError(RuntimeError):
+    """Raised in replay-only mode when a request has no recorded response."""
+
+
+def _strip_call_ids(content: Optional[dict]) -> Optional[dict]:
+    # FunctionCall/FunctionResponse ids are generated per run, so they must
+    # not affect the key. Only those two fields are dropped: an "id" inside
+    # the call's args or the tool's response is part of the conversation.
+    if not content:
+        return content
+    parts = []
+    for part in content.get("parts") or []:
+        part = dict(part)
+        for field in ("function_call", "function_response"):
+            if isinstance(part.get(field), dict):
+                part[field] = {k: v for k, v in part[field].items() if k != "id"}
+        parts.append(part)
+    return {**content, "parts": parts}
+
+
+def request_cache_key(llm_request: LlmRequest) -> str:
+    """Hashes the parts of a request that decide the model's answer."""
+    config = llm_request.config
+    system_instruction = config.system_instruction if config else None
+    if hasattr(system_instruction, "model_dump"):
+        system_instruction = system_instruction.model_dump(mode="json", exclude_none=True)
+    key_material = {
+        "model": llm_request.model,
+        "system_instruction": system_instruction,
+        "tools": (
+            [tool.model_dump(mode="json", exclude_none=True) for tool in config.tools]
+            if config and config.tools
+            else []
+        ),
+        "contents": [
+            _strip_call_ids(content.model_dump(mode="json", exclude_none=True))
+            for content in llm_request.contents
+        ],
+    }
+    encoded = json.dumps(key_material, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class LlmResponseCache:
+    """SQLite-backed response store with TTL and LRU eviction.
+
+    Args:
+        path: SQLite file holding the cache.
+        ttl_seconds: Entries older than this are treated as misses. None keeps
+                     entries forever.
+        max_entries: Least recently used entries are evicted above this count.
+        max_bytes: Least recently used entries are evicted above this total
+                   payload size.
+    """
+
+    def __init__(
+        self,
+        path: str = "llm_cache.db",
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = 10_000,
+        max_bytes: Optional[int] = None,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """create table if not exists llm_responses (
+                key text primary key,
+                model text,
+                responses text not null,
+                size integer not null,
+                created_at real not null,
+                last_access real not null
+            )"""
+        )
+        self._connection.execute(
+            "create index if not exists ix_llm_responses_last_access"
+            " on llm_responses (last_access)"
+        )
+        self._connection.commit()
+
+    def get(self, key: str) -> Optional[list[LlmResponse]]:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "select responses, created_at from llm_responses where key = ?",
+                (key,),
+            ).fetchone()
+            if row and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                self._connection.execute("delete from llm_responses where key = ?", (key,))
+                self._connection.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._connection.execute(
+                "update llm_responses set last_access = ? where key = ?", (now, key)
+            )
+            self._connection.commit()
+            self.hits += 1
+        return [LlmResponse.model_validate(r) for r in json.loads(row[0])]
+
+    def put(self, key: str, model: str, responses: list[dict]) -> None:
+        payload = json.dumps(responses, separators=(",", ":"))
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "insert or replace into llm_responses values (?, ?, ?, ?, ?, ?)",
+                (key, model, payload, len(payload), now, now),
+            )
+            self._evict()
+            self._connection.commit()
+
+    def _evict(self) -> None:
+        if self.ttl_seconds is not None:
+            self._connection.execute(
+                "delete from llm_responses where created_at < ?",
+                (time.time() - self.ttl_seconds,),
+            )
+        if self.max_entries is not None:
+            self._connection.execute(
+                """delete from llm_responses where key in (
+                    select key from llm_responses order by last_access desc
+                    limit -1 offset ?)""",
+                (self.max_entries,),
+            )
+        if self.max_bytes is not None:
+            total = self._connection.execute(
+                "select coalesce(sum(size), 0) from llm_responses"
+            ).fetchone()[0]
+            rows = self._connection.execute(
+                "select key, size from llm_responses order by last_access"
+            )
+            evicted = []
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                evicted.append((key,))
+                total -= size
+            self._connection.executemany(
+                "delete from llm_responses where key = ?", evicted
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("delete from llm_responses")
+            self._connection.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._connection.execute(
+                "select count(*), coalesce(sum(size), 0) from llm_responses"
+            ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class CachedLlm(BaseLlm):
+    """Wraps another model and answers repeated requests from the cache.
+
+    Attributes:
+        llm: The real model (Gemini, FakeGemini, ...).
+        replay_only: Raise CacheMissError instead of calling the real model.
+                     Meant for CI, where no network call should ever happen.
+    """
+
+    llm: BaseLlm
+    replay_only: bool = False
+
+    _cache: LlmResponseCache = PrivateAttr()
+
+    def __init__(self, llm: BaseLlm, cache: LlmResponseCache, **kwargs):
+        super().__init__(llm=llm, model=kwargs.pop("model", llm.model), **kwargs)
+        self._cache = cache
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ):
+        key = request_cache_key(llm_request)
+        cached = self._cache.get(key)
+        if cached is not None:
+            # The final (non-partial) responses are enough to rebuild the turn
+            for llm_response in cached:
+                yield llm_response
+            return
+
+        if self.replay_only:
+            raise CacheMissError(
+                f"No recorded response for model {llm_request.model} (key {key[:12]})"
+            )
+
+        recorded = []
+        async for llm_response in self.llm.generate_content_async(
+            llm_request, stream=stream
+        ):
+            # Serialize right away: ADK mutates events (e.g. call ids) later on
+            if not llm_response.partial:
+                dumped = llm_response.model_dump(mode="json", exclude_none=True)
+                if "content" in dumped:
+                    dumped["content"] = _strip_call_ids(dumped["content"])
+                recorded.append(dumped)
+            yield llm_response
+
+        if recorded and not any(r.get("error_code") for r in recorded):
+            self._cache.put(key, llm_request.model, recorded)
+
+
+def use_response_cache(
+    agent_or_app, cache: LlmResponseCache, replay_only: bool = False
+) -> dict:
+    """Wraps the model of every LlmAgent in the tree with a CachedLlm.
+
+    Returns:
+        Dictionary mapping agent name to its CachedLlm.
+    """
+    return replace_models(
+        agent_or_app,
+        lambda agent: CachedLlm(
+            llm=agent.canonical_model, cache=cache, replay_only=replay_only
+        ),
+    )
+
+
+print("✅ LLM response cache defined.")
@@ -0,0 +1,293 @@
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.mcp_tool.mcp_session_manager import (
+    MCPSessionManager,
+    StdioConnectionParams,
+)
+from google.adk.tools.mcp_tool.mcp_tool import McpTool
+from google.adk.tools.mcp_tool.mcp_toolset import McpToolset
+from mcp import ClientSession
+from contextlib import AsyncExitStack
+from datetime import timedelta
+from typing import Optional
+import asyncio
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+# Process-wide pool of warm MCP server connections.
+#
+# McpToolset starts its stdio server lazily on the first get_tools() call and
+# lists the tools again on every LLM request. PooledMcpToolset starts the
+# server ahead of time (warm_up), caches the tool list, pings the server in
+# the background, stops it after `idle_timeout` seconds without use, and is
+# shared by every agent and Runner of the process through pooled_mcp_toolset().
+
+
+class PooledMCPSessionManager(MCPSessionManager):
+    """MCPSessionManager whose connection is owned by a dedicated task.
+
+    anyio requires a stdio client to be closed by the task that opened it;
+    running the connection in its own task lets the health checker and the
+    idle reaper close it from anywhere.
+
+    The connection belongs to the event loop that opened it. When used from
+    another loop (a second asyncio.run(), a new notebook cell), the old
+    connection is dropped, since its loop is gone, and a new one is opened.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._session = None
+        self._owner = None
+        self._stop = None
+        self._loop = None
+        self.spawns = 0
+        self.last_used = time.monotonic()
+
+    def _bind_to_running_loop(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # The tasks and streams of an earlier loop cannot be awaited or
+            # closed from this one; forget them and start over
+            self._loop = loop
+            self._session = None
+            self._owner = None
+            self._stop = None
+            self._session_lock = asyncio.Lock()
+
+    async def _own_connection(self, ready: asyncio.Future):
+        self._stop = asyncio.Event()
+        async with AsyncExitStack() as exit_stack:
+            try:
+                transports = await exit_stack.enter_async_context(self._create_client())
+                read_timeout = None
+                if isinstance(self._connection_params, StdioConnectionParams):
+                    read_timeout = timedelta(seconds=self._connection_params.timeout)
+                session = await exit_stack.enter_async_context(
+                    ClientSession(*transports[:2], read_timeout_seconds=read_timeout)
+                )
+                await session.initialize()
+            except BaseException as e:
+                if not ready.done():
+                    ready.set_exception(e)
+                return
+            ready.set_result(session)
+            await self._stop.wait()
+
+    def _connected(self) -> bool:
+        return (
+            self._loop is asyncio.get_running_loop()
+            and self._session is not None
+            and self._owner is not None
+            and not self._owner.done()
+            and not self._is_session_disconnected(self._session)
+        )
+
+    async def create_session(self, headers=None) -> ClientSession:
+        self.last_used = time.monotonic()
+        self._bind_to_running_loop()
+        if self._connected():
+            return self._session
+        async with self._session_lock:
+            if self._connected():
+                return self._session
+            await self._close_connection()
+            ready = asyncio.get_running_loop().create_future()
+            self._owner = asyncio.create_task(self._own_connection(ready))
+            self._session = await ready
+            self.spawns += 1
+            return self._session
+
+    async def _close_connection(self):
+        owner, self._owner, self._session = self._owner, None, None
+        if owner is not None and not owner.done():
+            self._stop.set()
+            try:
+                await owner
+            except Exception as e:
+                logger.warning("Error while closing MCP connection: %s", e)
+
+    async def close(self):
+        self._bind_to_running_loop()
+        async with self._session_lock:
+            await self._close_connection()
+
+
+class PooledMcpToolset(McpToolset):
+    """McpToolset with a warm, health-checked and reaped server connection.
+
+    Args:
+        connection_params: Same as McpToolset.
+        tool_filter: Same as McpToolset.
+        idle_timeout: Seconds without tool use before the server is stopped.
+                      It is started again on the next use. None keeps it up.
+        health_check_interval: Seconds between background pings.
+        tool_cache_ttl: Seconds the tool list stays cached. None caches it
+                        until the server is restarted.
+    """
+
+    def __init__(
+        self,
+        *,
+        connection_params,
+        idle_timeout: Optional[float] = 300.0,
+        health_check_interval: float = 30.0,
+        tool_cache_ttl: Optional[float] = None,
+        **kwargs,
+    ):
+        super().__init__(connection_params=connection_params, **kwargs)
+        # Same settings, connection owned by a dedicated task
+        self._mcp_session_manager = PooledMCPSessionManager(
+            connection_params=self._connection_params, errlog=self._errlog
+        )
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.tool_cache_ttl = tool_cache_ttl
+
+        self._tools = None
+        self._tools_listed_at = 0.0
+        self._tools_spawn = 0
+        self._monitor = None
+        self.stats = {"tool_list_calls": 0, "tool_list_hits": 0, "pings": 0, "reaped": 0}
+
+    def _tools_fresh(self) -> bool:
+        manager = self._mcp_session_manager
+        if self._tools is None or self._tools_spawn != manager.spawns:
+            return False
+        if self.tool_cache_ttl is None:
+            return True
+        return time.monotonic() - self._tools_listed_at < self.tool_cache_ttl
+
+    async def _list_tools(self) -> list[McpTool]:
+        session = await self._mcp_session_manager.create_session()
+        self.stats["tool_list_calls"] += 1
+        tools_response = await session.list_tools()
+        self._tools = [
+            McpTool(
+                mcp_tool=tool,
+                mcp_session_manager=self._mcp_session_manager,
+                auth_scheme=self._auth_scheme,
+                auth_credential=self._auth_credential,
+                require_confirmation=self._require_confirmation,
+                header_provider=self._header_provider,
+            )
+            for tool in tools_response.tools
+        ]
+        self._tools_listed_at = time.monotonic()
+        self._tools_spawn = self._mcp_session_manager.spawns
+        return self._tools
+
+    async def get_tools(
+        self, readonly_context: Optional[ReadonlyContext] = None
+    ) -> list[BaseTool]:
+        if self._tools_fresh():
+            self.stats["tool_list_hits"] += 1
+            tools = self._tools
+        else:
+            tools = await self._list_tools()
+        self._ensure_monitor()
+        return [tool for tool in tools if self._is_tool_selected(tool, readonly_context)]
+
+    async def warm_up(self) -> None:
+        """Starts the server and lists its tools before the first request."""
+        start = time.perf_counter()
+        await self._list_tools()
+        self._ensure_monitor()
+        logger.info("MCP server warmed up in %.2fs", time.perf_counter() - start)
+
+    async def ping(self) -> bool:
+        """Health check; restarts the connection on the next use if it fails."""
+        manager = self._mcp_session_manager
+        if not manager._connected():
+            return False
+        self.stats["pings"] += 1
+        try:
+            await asyncio.wait_for(manager._session.send_ping(), timeout=5)
+            return True
+        except Exception as e:
+            logger.warning("MCP server failed its health check: %s", e)
+            await manager.close()
+            return False
+
+    def _ensure_monitor(self):
+        # A monitor of an earlier event loop is gone with it
+        if (
+            self._monitor is None
+            or self._monitor.done()
+            or self._monitor.get_loop() is not asyncio.get_running_loop()
+        ):
+            self._monitor = asyncio.create_task(self._monitor_connection())
+
+    async def _monitor_connection(self):
+        manager = self._mcp_session_manager
+        while manager._connected():
+            await asyncio.sleep(self.health_check_interval)
+            idle = time.monotonic() - manager.last_used
+            if self.idle_timeout is not None and idle >= self.idle_timeout:
+                # Reap the idle server; the next tool use starts it again
+                self.stats["reaped"] += 1
+                await manager.close()
+                return
+            await self.ping()
+
+    async def close(self) -> None:
+        # Runner.close() closes every toolset of its agents; a pooled
+        # connection outlives single runners, so only shutdown() stops it.
+        pass
+
+    async def shutdown(self) -> None:
+        """Stops the background checks and the server."""
+        if (
+            self._monitor
+            and not self._monitor.done()
+            and self._monitor.get_loop() is asyncio.get_running_loop()
+        ):
+            self._monitor.cancel()
+        await self._mcp_session_manager.close()
+        self._tools = None
+
+
+_pool = {}
+
+
+def _pool_key(connection_params, tool_filter) -> str:
+    if hasattr(connection_params, "model_dump"):
+        params = connection_params.model_dump(mode="json")
+    else:
+        params = repr(connection_params)
+    return json.dumps(
+        [params, tool_filter if isinstance(tool_filter, list) else repr(tool_filter)],
+        sort_keys=True,
+        default=str,
+    )
+
+
+def pooled_mcp_toolset(connection_params, tool_filter=None, **kwargs) -> PooledMcpToolset:
+    """Returns the process-wide PooledMcpToolset for these parameters.
+
+    Agents are usually built at import time, before any event loop runs, so
+    the toolset is shared across loops; its connection is reopened in each
+    event loop that uses it (see PooledMCPSessionManager).
+    """
+    key = _pool_key(connection_params, tool_filter)
+    if key not in _pool:
+        _pool[key] = PooledMcpToolset(
+            connection_params=connection_params, tool_filter=tool_filter, **kwargs
+        )
+    return _pool[key]
+
+
+async def warm_up_mcp_pool() -> None:
+    """Starts every pooled server concurrently (call once at worker startup)."""
+    await asyncio.gather(*(toolset.warm_up() for toolset in _pool.values()))
+
+
+async def shutdown_mcp_pool() -> None:
+    await asyncio.gather(*(toolset.shutdown() for toolset in _pool.values()))
+
+
+print("✅ MCP connection pool defined.")
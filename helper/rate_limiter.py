@@ -0,0 +1,180 @@
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from helper.fake_llm import replace_models
+from helper.token_estimator import estimate_request_tokens
+from contextlib import asynccontextmanager
+from pydantic import PrivateAttr
+from typing import Optional
+import asyncio
+import time
+
+
+# Client-side quota scheduler shared by every branch of a ParallelAgent.
+# Calls wait in a FIFO queue until a request slot and enough tokens are
+# available, instead of all firing at once, getting 429s and sleeping through
+# the exponential retry backoff.
+
+
+class TokenBucket:
+    """Refills `rate_per_minute` units per minute up to `capacity`."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(
+            self.capacity, self.level + (now - self._updated) * self.rate_per_second
+        )
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if available now)."""
+        self._refill()
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate_per_second)
+
+    def take(self, amount: float):
+        # The level may go negative when actual usage exceeds the estimate;
+        # later callers then wait for the debt to be refilled.
+        self._refill()
+        self.level -= amount
+
+
+class RateLimiter:
+    """Max-in-flight, requests-per-minute and tokens-per-minute budgets.
+
+    Args:
+        max_in_flight: Maximum number of concurrent model calls.
+        requests_per_minute: Request budget (RPM quota).
+        tokens_per_minute: Token budget (TPM quota).
+    """
+
+    def __init__(
+        self,
+        max_in_flight: Optional[int] = None,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ):
+        self._in_flight = asyncio.Semaphore(max_in_flight) if max_in_flight else None
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        # Callers acquire budget one at a time, in arrival order
+        self._queue = asyncio.Lock()
+
+        self.calls = 0
+        self.total_wait_s = 0.0
+        self.max_wait_s = 0.0
+
+    async def _take_budget(self, tokens: int):
+        async with self._queue:
+            while True:
+                wait = max(
+                    self._requests.wait_time(1) if self._requests else 0.0,
+                    self._tokens.wait_time(tokens) if self._tokens else 0.0,
+                )
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            if self._requests:
+                self._requests.take(1)
+            if self._tokens:
+                self._tokens.take(tokens)
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int):
+        """Charges the difference between estimated and actual token usage."""
+        if self._tokens and actual_tokens:
+            self._tokens.take(actual_tokens - estimated_tokens)
+
+    @asynccontextmanager
+    async def in_flight(self):
+        """Holds only an in-flight slot (the budget was already taken)."""
+        if self._in_flight:
+            await self._in_flight.acquire()
+        try:
+            yield
+        finally:
+            if self._in_flight:
+                self._in_flight.release()
+
+    @asynccontextmanager
+    async def slot(self, tokens: int = 0):
+        start = time.perf_counter()
+        if self._in_flight:
+            await self._in_flight.acquire()
+        try:
+            await self._take_budget(tokens)
+            waited = time.perf_counter() - start
+            self.calls += 1
+            self.total_wait_s += waited
+            self.max_wait_s = max(self.max_wait_s, waited)
+            yield
+        finally:
+            if self._in_flight:
+                self._in_flight.release()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "total_wait_s": self.total_wait_s,
+            "max_wait_s": self.max_wait_s,
+            "avg_wait_s": self.total_wait_s / self.calls if self.calls else 0.0,
+        }
+
+
+class RateLimitedLlm(BaseLlm):
+    """Wraps a model so each call first waits for budget from a shared limiter."""
+
+    llm: BaseLlm
+
+    _limiter: RateLimiter = PrivateAttr()
+
+    def __init__(self, llm: BaseLlm, limiter: RateLimiter, **kwargs):
+        super().__init__(llm=llm, model=kwargs.pop("model", llm.model), **kwargs)
+        self._limiter = limiter
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ):
+        estimated_tokens = estimate_request_tokens(llm_request)
+        responses = self.llm.generate_content_async(llm_request, stream=stream)
+        # The slot is held only while the model produces a response, never
+        # across the yield: ADK runs the function calls (and nested AgentTool
+        # model calls) while this generator is suspended there, so holding it
+        # would idle the slot and can deadlock on max_in_flight.
+        slot = self._limiter.slot(estimated_tokens)
+        try:
+            while True:
+                async with slot:
+                    try:
+                        llm_response = await responses.__anext__()
+                    except StopAsyncIteration:
+                        return
+                    usage = llm_response.usage_metadata
+                    if usage and usage.total_token_count and not llm_response.partial:
+                        self._limiter.record_usage(
+                            estimated_tokens, usage.total_token_count
+                        )
+                # Budget is taken once per call; later chunks only need a slot
+                slot = self._limiter.in_flight()
+                yield llm_response
+        finally:
+            await responses.aclose()
+
+
+def use_rate_limiter(agent_or_app, limiter: RateLimiter) -> dict:
+    """Routes every LlmAgent in the tree through the same RateLimiter.
+
+    Returns:
+        Dictionary mapping agent name to its RateLimitedLlm.
+    """
+    return replace_models(
+        agent_or_app,
+        lambda agent: RateLimitedLlm(llm=agent.canonical_model, limiter=limiter),
+    )
+
+
+print("✅ Rate limiter defined.")
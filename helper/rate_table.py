@@ -0,0 +1,158 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+
+# Memory-mapped exchange rate and fee table.
+#
+# The tables live in one file: a small JSON header (pivot currency, currency
+# codes, payment methods) followed by two float64 arrays, the base x target
+# rate matrix and the fee percentages. Every worker process maps the same
+# file read-only, so the OS page cache holds one copy for all of them.
+# write_rate_table() replaces the file atomically (os.replace), and
+# RateTable notices the new file (inode, size or mtime changed) and remaps it
+# without a restart.
+#
+# Layout: MAGIC | uint32 header length | JSON header | padding to 8 bytes |
+#         rates (n x n float64) | fees (m float64)
+
+MAGIC = b"ADKRATE1"
+_LENGTH = struct.Struct("<I")
+
+
+@dataclass(frozen=True)
+class RateSnapshot:
+    """One consistent version of the tables.
+
+    rate_matrix[currency_index[base], currency_index[target]] is the number of
+    target units per 1 unit of base; fee_percentages[method_index[method]] is
+    the fee in percent (0.75 means 0.75%).
+    """
+
+    pivot: str
+    currency_index: dict
+    method_index: dict
+    rate_matrix: np.ndarray
+    fee_percentages: np.ndarray
+    file_id: tuple
+
+
+def write_rate_table(path, rates_per_pivot, fee_percentages, pivot="usd"):
+    """Writes the tables and atomically replaces `path`.
+
+    Args:
+        path: Table file.
+        rates_per_pivot: {currency: units per 1 unit of the pivot currency}.
+                         Every pair is triangulated through the pivot.
+        fee_percentages: {payment method: fee in percent}.
+        pivot: Currency with a rate of 1.
+    """
+    currencies = [code.lower() for code in rates_per_pivot]
+    methods = [method.lower() for method in fee_percentages]
+    if pivot.lower() not in currencies:
+        raise ValueError(f"Pivot currency {pivot} has no rate")
+
+    per_pivot = np.array(list(rates_per_pivot.values()), dtype=np.float64)
+    # rate_matrix[base, target]: units of target per 1 unit of base
+    rate_matrix = per_pivot[np.newaxis, :] / per_pivot[:, np.newaxis]
+    fees = np.array(list(fee_percentages.values()), dtype=np.float64)
+
+    header = json.dumps(
+        {"pivot": pivot.lower(), "currencies": currencies, "methods": methods}
+    ).encode()
+    prefix = MAGIC + _LENGTH.pack(len(header)) + header
+    padding = b"\0" * (-len(prefix) % 8)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(prefix + padding)
+        f.write(rate_matrix.tobytes())
+        f.write(fees.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    # Readers see either the old file or the new one, never a partial write
+    os.replace(tmp_path, path)
+
+
+def _file_id(stat: os.stat_result) -> tuple:
+    # os.replace() within the mtime granularity keeps st_mtime_ns, but the
+    # new file has its own inode
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def _map_snapshot(path) -> RateSnapshot:
+    with open(path, "rb") as f:
+        file_id = _file_id(os.fstat(f.fileno()))
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if buffer[: len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a rate table")
+    (header_length,) = _LENGTH.unpack_from(buffer, len(MAGIC))
+    header_start = len(MAGIC) + _LENGTH.size
+    header = json.loads(buffer[header_start : header_start + header_length])
+    offset = header_start + header_length
+    offset += -offset % 8
+
+    n = len(header["currencies"])
+    m = len(header["methods"])
+    # Views into the mapping, no copy; the mapping stays open while they live
+    rate_matrix = np.frombuffer(buffer, dtype=np.float64, count=n * n, offset=offset)
+    fees = np.frombuffer(buffer, dtype=np.float64, count=m, offset=offset + 8 * n * n)
+    return RateSnapshot(
+        pivot=header["pivot"],
+        currency_index={code: i for i, code in enumerate(header["currencies"])},
+        method_index={method: i for i, method in enumerate(header["methods"])},
+        rate_matrix=rate_matrix.reshape(n, n),
+        fee_percentages=fees,
+        file_id=file_id,
+    )
+
+
+class RateTable:
+    """Read-only, hot-reloading view of a rate table file.
+
+    Args:
+        path: File written by write_rate_table().
+        check_interval: Seconds between file checks; lookups in between
+                        reuse the current mapping without a stat call.
+    """
+
+    def __init__(self, path, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._snapshot = _map_snapshot(path)
+        self._checked_at = time.monotonic()
+
+    def current(self) -> RateSnapshot:
+        """The latest snapshot; remaps the file if it was replaced.
+
+        Callers should take one snapshot per lookup batch, so a reload
+        in the middle never mixes two versions of the tables.
+        """
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._snapshot
+        with self._lock:
+            if now - self._checked_at >= self.check_interval:
+                self._checked_at = now
+                try:
+                    if _file_id(os.stat(self.path)) != self._snapshot.file_id:
+                        self._snapshot = _map_snapshot(self.path)
+                        self.reloads += 1
+                except (OSError, ValueError):
+                    # Keep serving the last good tables
+                    pass
+        return self._snapshot
+
+
+print("✅ Memory-mapped rate table defined.")
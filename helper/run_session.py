@@ -1,7 +1,10 @@
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.runners import Runner
 from google.genai import types
 from dotenv import load_dotenv
+import asyncio
 import os
+import time
 
 load_dotenv()
 
@@ -9,6 +12,18 @@ load_dotenv()
 USER_ID = os.getenv("USER_ID")
 
 
+async def _get_or_create_session(session_service, app_name, user_id, session_id):
+    # Attempt to create a new session or retrieve an existing one
+    try:
+        return await session_service.create_session(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        )
+    except:
+        return await session_service.get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        )
+
+
 # Define helper functions that will be reused throughout the notebook
 async def run_session(
     runner_instance: Runner,
@@ -16,21 +31,16 @@ async def run_session(
     root_agent,
     user_queries: list[str] | str = None,
     session_name: str = "default",
+    streaming: bool = False,
 ):
     print(f"\n ### Session: {session_name}")
 
     # Get app name from the Runner
     app_name = runner_instance.app_name
 
-    # Attempt to create a new session or retrieve an existing one
-    try:
-        session = await session_service.create_session(
-            app_name=app_name, user_id=USER_ID, session_id=session_name
-        )
-    except:
-        session = await session_service.get_session(
-            app_name=app_name, user_id=USER_ID, session_id=session_name
-        )
+    session = await _get_or_create_session(
+        session_service, app_name, USER_ID, session_name
+    )
 
     # Process queries if provided
     if user_queries:
@@ -42,6 +52,10 @@ async def run_session(
         for query in user_queries:
             print(f"\nUser > {query}")
 
+            if streaming:
+                await stream_turn(runner_instance, USER_ID, session.id, query)
+                continue
+
             # Convert the query string to the ADK Content format
             query = types.Content(role="user", parts=[types.Part(text=query)])
 
@@ -61,4 +75,223 @@ async def run_session(
         print("No queries!")
 
 
+async def stream_turn(
+    runner_instance: Runner,
+    user_id: str,
+    session_id: str,
+    query: str,
+    quiet: bool = False,
+) -> dict:
+    """Runs one turn with SSE streaming, printing text as it arrives.
+
+    Partial text is printed as soon as each chunk arrives, tool calls get a
+    start and an end marker, and the time to the first token is measured.
+
+    Returns:
+        Dictionary with the turn metrics and events.
+        {"ttft_s": 0.42, "latency_s": 2.1, "text": "...",
+         "tool_calls": [{"name": "google_search", "duration_s": 1.2}],
+         "events": [Event, ...]}
+    """
+    content = types.Content(role="user", parts=[types.Part(text=query)])
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE)
+
+    start = time.perf_counter()
+    ttft = None
+    events = []
+    tool_starts = {}  # function call id -> (name, start time)
+    tool_calls = []
+    streamed_authors = set()  # authors whose reply was already printed in chunks
+    final_text = []
+
+    async for event in runner_instance.run_async(
+        user_id=user_id,
+        session_id=session_id,
+        new_message=content,
+        run_config=run_config,
+    ):
+        events.append(event)
+        now = time.perf_counter()
+
+        for call in event.get_function_calls():
+            tool_starts[call.id] = (call.name, now)
+            if not quiet:
+                print(f"\n🔧 {event.author} calls {call.name}({call.args or {}}) ...")
+        for response in event.get_function_responses():
+            name, called_at = tool_starts.pop(response.id, (response.name, now))
+            tool_calls.append({"name": name, "duration_s": now - called_at})
+            if not quiet:
+                print(f"✔️  {name} finished in {now - called_at:.2f}s")
+
+        text = "".join(
+            part.text
+            for part in (event.content.parts if event.content else None) or []
+            if part.text and not part.thought
+        )
+        if not text or text == "None":
+            continue
+        if ttft is None:
+            ttft = now - start
+
+        if event.partial:
+            # Print the delta right away
+            if not quiet and event.author not in streamed_authors:
+                print(f"{event.author} > ", end="", flush=True)
+            streamed_authors.add(event.author)
+            if not quiet:
+                print(text, end="", flush=True)
+        else:
+            # The final event repeats the streamed chunks as one text
+            if not quiet:
+                if event.author in streamed_authors:
+                    print()
+                else:
+                    print(f"{event.author} > ", text)
+            streamed_authors.discard(event.author)
+            final_text.append(text)
+
+    latency = time.perf_counter() - start
+    if not quiet:
+        ttft_text = f"{ttft:.2f}s" if ttft is not None else "n/a"
+        print(f"⏱️  time to first token {ttft_text}, total {latency:.2f}s")
+    return {
+        "ttft_s": ttft,
+        "latency_s": latency,
+        "text": "\n".join(final_text),
+        "tool_calls": tool_calls,
+        "events": events,
+    }
+
+
+async def run_streaming(
+    runner_instance: Runner,
+    user_queries: list[str] | str,
+    session_id: str = "debug_session_id",
+    user_id: str = "debug_user_id",
+    quiet: bool = False,
+) -> list[dict]:
+    """Streaming counterpart of Runner.run_debug().
+
+    Uses the Runner's own session service, creates the session if needed and
+    streams every query through stream_turn().
+
+    Returns:
+        One stream_turn() result per query.
+    """
+    if isinstance(user_queries, str):
+        user_queries = [user_queries]
+
+    session = await _get_or_create_session(
+        runner_instance.session_service,
+        runner_instance.app_name,
+        user_id,
+        session_id,
+    )
+
+    turns = []
+    for query in user_queries:
+        if not quiet:
+            print(f"\nUser > {query}")
+        turns.append(
+            await stream_turn(runner_instance, user_id, session.id, query, quiet=quiet)
+        )
+    return turns
+
+
+async def run_sessions_concurrently(
+    runner_instance: Runner,
+    session_service,
+    jobs,
+    max_concurrency: int = 10,
+    user_id: str = None,
+    verbose: bool = False,
+) -> dict:
+    """Replays many conversations through one Runner at the same time.
+
+    Sessions run concurrently (at most `max_concurrency` at once), while the
+    turns inside each session are still sent one after the other so the
+    conversation history stays in order.
+
+    Args:
+        runner_instance: The Runner every session is replayed through.
+        session_service: The session service used by the Runner.
+        jobs: Iterable of (session_id, queries) pairs. `queries` is a list of
+              user messages or a single string.
+        max_concurrency: Maximum number of sessions in flight at once.
+        user_id: User the sessions belong to. Defaults to USER_ID.
+        verbose: Print every agent reply (noisy for large replays).
+
+    Returns:
+        Dictionary with one entry per session and the aggregate throughput.
+        {"sessions": [{"session_id": "s1", "turns": 2, "latency_s": 1.3,
+                       "turn_latencies_s": [0.6, 0.7], "error": None}],
+         "total_sessions": 1, "total_turns": 2, "failed_sessions": 0,
+         "wall_time_s": 1.3, "sessions_per_s": 0.77, "turns_per_s": 1.54}
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    user_id = user_id or USER_ID
+    app_name = runner_instance.app_name
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_one_session(session_id, queries):
+        # Convert single query to list for uniform processing
+        if isinstance(queries, str):
+            queries = [queries]
+
+        result = {
+            "session_id": session_id,
+            "turns": 0,
+            "latency_s": 0.0,
+            "turn_latencies_s": [],
+            "error": None,
+        }
+
+        async with semaphore:
+            session_start = time.perf_counter()
+            try:
+                session = await _get_or_create_session(
+                    session_service, app_name, user_id, session_id
+                )
+
+                # Turns of one session stay sequential
+                for query in queries:
+                    turn_start = time.perf_counter()
+                    content = types.Content(role="user", parts=[types.Part(text=query)])
+                    async for event in runner_instance.run_async(
+                        user_id=user_id, session_id=session.id, new_message=content
+                    ):
+                        if verbose and event.content and event.content.parts:
+                            text = event.content.parts[0].text
+                            if text and text != "None":
+                                print(f"[{session_id}] {event.author} > ", text)
+
+                    result["turn_latencies_s"].append(time.perf_counter() - turn_start)
+                    result["turns"] += 1
+            except Exception as e:
+                # One broken conversation should not abort the whole replay
+                result["error"] = f"{type(e).__name__}: {e}"
+            result["latency_s"] = time.perf_counter() - session_start
+
+        return result
+
+    batch_start = time.perf_counter()
+    sessions = await asyncio.gather(
+        *(run_one_session(session_id, queries) for session_id, queries in jobs)
+    )
+    wall_time = time.perf_counter() - batch_start
+
+    total_turns = sum(s["turns"] for s in sessions)
+    return {
+        "sessions": sessions,
+        "total_sessions": len(sessions),
+        "total_turns": total_turns,
+        "failed_sessions": sum(1 for s in sessions if s["error"]),
+        "wall_time_s": wall_time,
+        "sessions_per_s": len(sessions) / wall_time if wall_time else 0.0,
+        "turns_per_s": total_turns / wall_time if wall_time else 0.0,
+    }
+
+
 print("✅ Helper functions defined.")
@@ -0,0 +1,237 @@
+from google.adk.events import Event, EventActions
+from google.adk.sessions import DatabaseSessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.adk.sessions.database_session_service import StorageEvent
+from datetime import datetime
+from sqlalchemy import Index, and_, or_, select
+from typing import AsyncGenerator, Optional
+import asyncio
+import bisect
+
+
+# Lazy, paginated access to the events of a DatabaseSessionService session.
+# get_session() loads every event of a conversation (content blobs included);
+# these helpers read only the pages or the tail that is actually needed.
+
+SESSION_TIMESTAMP_INDEX = Index(
+    "ix_events_session_timestamp",
+    StorageEvent.app_name,
+    StorageEvent.user_id,
+    StorageEvent.session_id,
+    StorageEvent.timestamp,
+)
+
+_indexed_engines = set()
+
+
+def to_event(storage_event: StorageEvent) -> Event:
+    """StorageEvent.to_event() with nested actions (e.g. compaction) restored.
+
+    ADK rebuilds the actions with model_copy(), which leaves nested models such
+    as EventCompaction as plain dicts.
+    """
+    event = storage_event.to_event()
+    restore_event_actions(event)
+    return event
+
+
+def restore_event_actions(event: Event) -> None:
+    if event.actions and isinstance(event.actions.compaction, dict):
+        event.actions = EventActions.model_validate(
+            event.actions.model_dump(exclude_none=True, warnings=False)
+        )
+
+
+def place_compactions(events: list[Event]) -> list[Event]:
+    """Moves each compaction right after the last event it covers.
+
+    ADK hides every event listed before a compaction from its start onwards,
+    so a compaction that keeps a tail of recent events must be listed before
+    that tail, although it was created after it. `events` are in timestamp
+    order, as a database session loads them; event timestamps are unchanged.
+    """
+    regular = [event for event in events if not (event.actions and event.actions.compaction)]
+    timestamps = [event.timestamp for event in regular]
+    before = {}  # index in regular -> compactions listed before that event
+    for event in events:
+        if event.actions and event.actions.compaction:
+            i = bisect.bisect_right(timestamps, event.actions.compaction.end_timestamp)
+            before.setdefault(i, []).append(event)
+
+    placed = []
+    for i, event in enumerate(regular):
+        placed.extend(before.get(i, []))
+        placed.append(event)
+    placed.extend(before.get(len(regular), []))
+    return placed
+
+
+def ensure_session_event_index(session_service: DatabaseSessionService) -> None:
+    """Creates the (app, user, session, timestamp) index used for paging."""
+    engine = session_service.db_engine
+    if id(engine) not in _indexed_engines:
+        SESSION_TIMESTAMP_INDEX.create(engine, checkfirst=True)
+        _indexed_engines.add(id(engine))
+
+
+async def _flush_pending(session_service):
+    # BatchedDatabaseSessionService may still hold unflushed events
+    if hasattr(session_service, "flush"):
+        await session_service.flush()
+
+
+def _session_filter(app_name, user_id, session_id):
+    return and_(
+        StorageEvent.app_name == app_name,
+        StorageEvent.user_id == user_id,
+        StorageEvent.session_id == session_id,
+    )
+
+
+async def iter_session_events(
+    session_service: DatabaseSessionService,
+    *,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+    after_timestamp: Optional[float] = None,
+    newest_first: bool = False,
+    page_size: int = 100,
+) -> AsyncGenerator[Event, None]:
+    """Yields the events of a session, loading `page_size` rows at a time.
+
+    Args:
+        after_timestamp: Only events at or after this time (seconds).
+        newest_first: Walk the conversation backwards from the latest event.
+        page_size: Number of rows fetched per database round trip.
+    """
+    ensure_session_event_index(session_service)
+    await _flush_pending(session_service)
+
+    order = (
+        (StorageEvent.timestamp.desc(), StorageEvent.id.desc())
+        if newest_first
+        else (StorageEvent.timestamp, StorageEvent.id)
+    )
+    cursor = None  # (timestamp, id) of the last row of the previous page
+
+    def load_page():
+        with session_service.database_session_factory() as sql_session:
+            query = select(StorageEvent).where(
+                _session_filter(app_name, user_id, session_id)
+            )
+            if after_timestamp is not None:
+                query = query.where(
+                    StorageEvent.timestamp >= datetime.fromtimestamp(after_timestamp)
+                )
+            if cursor is not None:
+                # Keyset pagination: continue right after the previous page
+                last_timestamp, last_id = cursor
+                if newest_first:
+                    query = query.where(
+                        or_(
+                            StorageEvent.timestamp < last_timestamp,
+                            and_(
+                                StorageEvent.timestamp == last_timestamp,
+                                StorageEvent.id < last_id,
+                            ),
+                        )
+                    )
+                else:
+                    query = query.where(
+                        or_(
+                            StorageEvent.timestamp > last_timestamp,
+                            and_(
+                                StorageEvent.timestamp == last_timestamp,
+                                StorageEvent.id > last_id,
+                            ),
+                        )
+                    )
+            rows = sql_session.scalars(query.order_by(*order).limit(page_size)).all()
+            if not rows:
+                return None, []
+            return (rows[-1].timestamp, rows[-1].id), [to_event(row) for row in rows]
+
+    while True:
+        cursor, events = await asyncio.to_thread(load_page)
+        for event in events:
+            yield event
+        if len(events) < page_size:
+            return
+
+
+async def find_latest_compaction_event(
+    session_service: DatabaseSessionService,
+    *,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+    page_size: int = 200,
+) -> Optional[Event]:
+    """Returns the most recent compaction event of a session, or None.
+
+    The scan walks backwards and reads only the id and actions columns, so
+    content blobs are never loaded except for the match.
+    """
+    ensure_session_event_index(session_service)
+    await _flush_pending(session_service)
+
+    def scan():
+        with session_service.database_session_factory() as sql_session:
+            rows = sql_session.execute(
+                select(StorageEvent.id, StorageEvent.actions)
+                .where(_session_filter(app_name, user_id, session_id))
+                .order_by(StorageEvent.timestamp.desc(), StorageEvent.id.desc())
+                .execution_options(yield_per=page_size)
+            )
+            for event_id, actions in rows:
+                if actions is not None and getattr(actions, "compaction", None):
+                    storage_event = sql_session.get(
+                        StorageEvent, (event_id, app_name, user_id, session_id)
+                    )
+                    return to_event(storage_event)
+        return None
+
+    return await asyncio.to_thread(scan)
+
+
+async def get_session_tail(
+    session_service: DatabaseSessionService,
+    *,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+    last_n: Optional[int] = None,
+    after_timestamp: Optional[float] = None,
+    since_compaction: bool = False,
+) -> Optional[Session]:
+    """Fetches a session with only part of its history.
+
+    Args:
+        last_n: Keep only the N most recent events.
+        after_timestamp: Keep only events at or after this time (seconds).
+        since_compaction: Keep the latest compaction event and the events it
+                          does not cover. Falls back to the full history when
+                          the session was never compacted.
+    """
+    ensure_session_event_index(session_service)
+    if since_compaction:
+        compaction_event = await find_latest_compaction_event(
+            session_service, app_name=app_name, user_id=user_id, session_id=session_id
+        )
+        if compaction_event:
+            end_timestamp = compaction_event.actions.compaction.end_timestamp
+            after_timestamp = max(after_timestamp or 0.0, end_timestamp)
+
+    session = await session_service.get_session(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        config=GetSessionConfig(
+            num_recent_events=last_n, after_timestamp=after_timestamp
+        ),
+    )
+    if session:
+        for event in session.events:
+            restore_event_actions(event)
+    return session
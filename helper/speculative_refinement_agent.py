@@ -0,0 +1,255 @@
+from google.adk.agents import BaseAgent, LlmAgent, ParallelAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.utils.context_utils import Aclosing
+from google.genai import types
+from helper.instruction_template import CompiledInstruction, compile_instruction
+from pydantic import PrivateAttr
+from typing import AsyncGenerator, Optional
+import re
+
+SCORE_PATTERN = re.compile(r"SCORE:\s*(-?\d+(?:\.\d+)?)", re.IGNORECASE)
+
+SCORE_INSTRUCTION = """
+
+Finish your answer with a last line of the form "SCORE: <0-10>" rating the
+story as it is now (10 = ready to publish). Write it even when you approve."""
+
+
+def parse_score(critique: str) -> tuple[str, Optional[float]]:
+    """Splits a critique into its text and its "SCORE:" value (None if absent)."""
+    matches = list(SCORE_PATTERN.finditer(critique or ""))
+    if not matches:
+        return (critique or "").strip(), None
+    text = SCORE_PATTERN.sub("", critique).strip()
+    return text, float(matches[-1].group(1))
+
+
+def _is_approved(critique_text: str) -> bool:
+    return critique_text.strip().rstrip(".!").strip().upper() == "APPROVED"
+
+
+class SpeculativeRefinementAgent(BaseAgent):
+    """Critic/refiner loop that refines several candidates at once.
+
+    sub_agents are the critic and the refiner, in that order, configured as
+    for a LoopAgent (the critic reads `story_key` and writes `critique_key`,
+    the refiner reads both and writes `story_key`). Each round runs
+    `candidates` copies of the refiner concurrently, each at its own
+    temperature, then scores every candidate with a copy of the critic,
+    also concurrently, and commits the best-scoring one to `story_key` and
+    its critique to `critique_key`. A round costs two model latencies
+    however many candidates run.
+
+    The critic copies are asked to end with "SCORE: <0-10>". Their
+    instruction is the critic's with every `{story_key}` placeholder pointing
+    at their candidate's state key, so the critic's instruction must be a
+    string or a compiled template that references `{story_key}`. The
+    candidate keys are cleared once the round's winner is committed.
+
+    Attributes:
+        candidates: Candidate refinements per round.
+        max_iterations: Maximum number of rounds.
+        story_key: State key of the text being refined.
+        critique_key: State key of the critique of that text.
+        target_score: Stop once the committed story scores at least this.
+        max_model_calls: Cost ceiling in model calls (one per agent run; the
+                         critic must not use tools and the candidate refiners
+                         get none). The last round runs fewer candidates to
+                         stay under it.
+        max_total_tokens: Cost ceiling in tokens, from the usage metadata of
+                          the responses; no round starts once it is reached.
+        temperatures: Temperature of each candidate refiner, cycled.
+        scores_key: State key receiving the scores of the last round.
+    """
+
+    candidates: int = 3
+    max_iterations: int = 2
+    story_key: str = "initial_story"
+    critique_key: str = "critique"
+    target_score: Optional[float] = None
+    max_model_calls: Optional[int] = None
+    max_total_tokens: Optional[int] = None
+    temperatures: list[float] = [0.4, 0.8, 1.2]
+    scores_key: str = "speculative_scores"
+
+    _critic: Optional[LlmAgent] = PrivateAttr(default=None)
+    _pools: dict = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, __context) -> None:
+        super().model_post_init(__context)
+        if len(self.sub_agents) != 2 or not all(
+            isinstance(agent, LlmAgent) for agent in self.sub_agents
+        ):
+            raise ValueError("sub_agents must be [critic LlmAgent, refiner LlmAgent]")
+        critic = self.sub_agents[0]
+        self._critic = self._scoring_critic(critic, critic.name, self.critique_key, None)
+        # Builds the full-size pools now, so a critic instruction without
+        # {story_key} fails here rather than mid-run
+        self._pool(self.candidates)
+
+    def _pool(self, n: int) -> tuple[ParallelAgent, ParallelAgent]:
+        """Refiner and critic pools of n candidates (smaller near the ceiling)."""
+        if n not in self._pools:
+            critic, refiner = self.sub_agents
+            refiners = ParallelAgent(
+                name=f"{self.name}_refiners_{n}",
+                sub_agents=[self._candidate_refiner(refiner, i) for i in range(n)],
+            )
+            critics = ParallelAgent(
+                name=f"{self.name}_critics_{n}",
+                sub_agents=[
+                    self._scoring_critic(
+                        critic,
+                        f"{critic.name}_candidate_{i}",
+                        self._candidate_critique_key(i),
+                        self._candidate_key(i),
+                    )
+                    for i in range(n)
+                ],
+            )
+            self._pools[n] = (refiners, critics)
+        return self._pools[n]
+
+    def _candidate_key(self, i: int) -> str:
+        return f"{self.story_key}_candidate_{i}"
+
+    def _candidate_critique_key(self, i: int) -> str:
+        return f"{self.critique_key}_candidate_{i}"
+
+    def _candidate_refiner(self, refiner: LlmAgent, i: int) -> LlmAgent:
+        config = refiner.generate_content_config or types.GenerateContentConfig()
+        temperature = self.temperatures[i % len(self.temperatures)]
+        return refiner.clone(
+            update={
+                "name": f"{refiner.name}_candidate_{i}",
+                "output_key": self._candidate_key(i),
+                # Candidates only ever see a critique that is not an approval
+                "tools": [],
+                "generate_content_config": config.model_copy(
+                    update={"temperature": temperature}
+                ),
+            }
+        )
+
+    def _scoring_critic(
+        self, critic: LlmAgent, name: str, output_key: str, candidate_key: Optional[str]
+    ) -> LlmAgent:
+        instruction = critic.instruction
+        compiled = isinstance(instruction, CompiledInstruction)
+        template = instruction.template if compiled else instruction
+        if not isinstance(template, str):
+            raise ValueError(
+                f"{critic.name}: the critic instruction must be a string or a"
+                " compiled template, not an InstructionProvider"
+            )
+        if candidate_key is not None:
+            # Render the candidate where the critic's template has the story
+            placeholder = re.compile(r"{\s*" + re.escape(self.story_key) + r"(\??)\s*}")
+            if not placeholder.search(template):
+                raise ValueError(
+                    f"{critic.name}: the critic instruction has no {{{self.story_key}}}"
+                )
+            template = placeholder.sub(
+                lambda match: "{" + candidate_key + match.group(1) + "}", template
+            )
+        template += SCORE_INSTRUCTION
+        return critic.clone(
+            update={
+                "name": name,
+                "output_key": output_key,
+                "instruction": compile_instruction(template) if compiled else template,
+            }
+        )
+
+    async def _run_counted(self, agent, ctx, usage) -> AsyncGenerator[Event, None]:
+        async with Aclosing(agent.run_async(ctx)) as agen:
+            async for event in agen:
+                if event.usage_metadata and event.usage_metadata.total_token_count:
+                    usage["tokens"] += event.usage_metadata.total_token_count
+                yield event
+
+    def _budget_left(self, usage) -> Optional[int]:
+        """Candidates the next round can afford (None: no call ceiling)."""
+        if self.max_total_tokens is not None and usage["tokens"] >= self.max_total_tokens:
+            return 0
+        if self.max_model_calls is None:
+            return None
+        return max(0, (self.max_model_calls - usage["calls"]) // 2)
+
+    def _done(self, critique: str) -> bool:
+        text, score = parse_score(critique)
+        if _is_approved(text):
+            return True
+        return self.target_score is not None and score is not None and score >= self.target_score
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        usage = {"calls": 0, "tokens": 0}
+
+        # Score the current draft on every run: a critique left in state by an
+        # earlier turn belongs to an earlier story. Later scores come from the pool.
+        usage["calls"] += 1
+        async for event in self._run_counted(self._critic, ctx, usage):
+            yield event
+
+        for _ in range(self.max_iterations):
+            if self._done(state.get(self.critique_key, "")):
+                return
+            affordable = self._budget_left(usage)
+            n = self.candidates if affordable is None else min(self.candidates, affordable)
+            if n == 0:
+                return
+
+            # Clear last round's candidates so a failed branch can't win with them
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                actions=EventActions(
+                    state_delta={
+                        key(i): None
+                        for i in range(n)
+                        for key in (self._candidate_key, self._candidate_critique_key)
+                    }
+                ),
+            )
+            for pool in self._pool(n):
+                usage["calls"] += n
+                async for event in self._run_counted(pool, ctx, usage):
+                    yield event
+
+            current_score = parse_score(state.get(self.critique_key, ""))[1]
+            scores = []
+            for i in range(n):
+                candidate = state.get(self._candidate_key(i))
+                critique = state.get(self._candidate_critique_key(i)) or ""
+                text, score = parse_score(critique)
+                if candidate is None:
+                    continue
+                if score is None:
+                    score = 10.0 if _is_approved(text) else float("-inf")
+                scores.append((score, i, candidate, critique))
+
+            state_delta = {self.scores_key: [round(s, 2) for s, *_ in scores if s != float("-inf")]}
+            # Candidates are working copies; don't leave them in the session
+            for i in range(n):
+                state_delta[self._candidate_key(i)] = None
+                state_delta[self._candidate_critique_key(i)] = None
+            if scores:
+                best_score, _, best, best_critique = max(scores, key=lambda s: (s[0], -s[1]))
+                # Keep the current story if no candidate beats it
+                if current_score is None or best_score >= current_score:
+                    state_delta[self.story_key] = best
+                    state_delta[self.critique_key] = best_critique
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                actions=EventActions(state_delta=state_delta),
+            )
+
+
+print("✅ Speculative refinement agent defined.")
@@ -0,0 +1,43 @@
+from google.adk.tools import AgentTool
+from google.adk.tools.tool_context import ToolContext
+from typing import Any
+
+
+class StateRefAgentTool(AgentTool):
+    """AgentTool that returns a reference to its result instead of the result.
+
+    AgentTool already copies the sub-agent's state changes (including its
+    output_key) into the caller's session, then also returns the full text to
+    the calling model, which usually repeats it as the argument of the next
+    tool. This tool returns only where the result is stored and a short
+    preview; the next agent reads it with a `{output_key}` placeholder.
+
+    Args:
+        agent: Sub-agent with an output_key.
+        preview_chars: Characters of the result included in the reference.
+    """
+
+    def __init__(self, agent, preview_chars: int = 200, **kwargs):
+        if not getattr(agent, "output_key", None):
+            raise ValueError(f"Agent {agent.name} needs an output_key to be passed by reference")
+        super().__init__(agent, **kwargs)
+        self.preview_chars = preview_chars
+
+    async def run_async(self, *, args: dict[str, Any], tool_context: ToolContext) -> Any:
+        result = await super().run_async(args=args, tool_context=tool_context)
+        key = self.agent.output_key
+        value = tool_context.state.get(key)
+        if value is None:
+            # Nothing was stored (e.g. no final response); fall back to the text
+            return result
+        text = value if isinstance(value, str) else str(value)
+        preview = text[: self.preview_chars]
+        return {
+            "status": "stored",
+            "state_key": key,
+            "length_chars": len(text),
+            "preview": preview + ("..." if len(text) > len(preview) else ""),
+        }
+
+
+print("✅ State reference AgentTool defined.")
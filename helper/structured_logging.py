@@ -0,0 +1,376 @@
+from google.adk.agents.base_agent import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Optional
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import time
+
+
+# Non-blocking JSON logging.
+#
+# logging.basicConfig(filename=...) formats and writes every record on the
+# thread that logs it, i.e. on the event loop. start_json_logging() puts a
+# QueueHandler in front instead: logging a record only enqueues it, and a
+# background QueueListener thread serializes it as one compact JSON line and
+# writes it to a size-rotated file.
+#
+# StructuredLoggingPlugin replaces LoggingPlugin (which prints multi-line text
+# to stdout for every callback) with one small record per callback, whose
+# level and sampling rate are set per callback type.
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one compact JSON object.
+
+    Fields passed as extra={"fields": {...}} are merged into the object.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, separators=(",", ":"), default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    # QueueHandler.prepare() runs the whole formatter on the logging thread.
+    # Only the message and the traceback are rendered here, since args and
+    # exc_info may change once the caller moves on; the JSON serialization
+    # is left to the listener thread.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener = None
+
+
+def start_json_logging(
+    filename: str = "logger.log",
+    level: int = logging.INFO,
+    max_bytes: int = 10 * 1024 * 1024,
+    backup_count: int = 5,
+    logger: Optional[logging.Logger] = None,
+) -> QueueListener:
+    """Sends log records to a JSON-lines file through a background thread.
+
+    Args:
+        filename: Log file; rotated to filename.1, .2, ... at max_bytes.
+        level: Minimum level of the configured logger.
+        max_bytes: Size at which the file is rotated.
+        backup_count: Rotated files kept.
+        logger: Logger to configure (default: the root logger). Its existing
+                handlers are replaced. A named logger also stops propagating,
+                so its records go to the file only and the root handlers
+                (e.g. the console of `adk web`) are left alone.
+
+    Returns:
+        The running QueueListener (stopped automatically at exit).
+    """
+    global _listener
+    stop_json_logging()
+
+    file_handler = RotatingFileHandler(
+        filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+    )
+    file_handler.setFormatter(JsonFormatter())
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+
+    target = logger or logging.getLogger()
+    for handler in list(target.handlers):
+        target.removeHandler(handler)
+    target.addHandler(_DeferredQueueHandler(log_queue))
+    target.setLevel(level)
+    if target is not logging.getLogger():
+        target.propagate = False
+    return _listener
+
+
+def stop_json_logging():
+    """Flushes the queued records and stops the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(stop_json_logging)
+
+
+def _preview(text: Optional[str], limit: int = 200) -> Optional[str]:
+    if text is None or len(text) <= limit:
+        return text
+    return text[:limit] + "..."
+
+
+def _content_text(content: Optional[types.Content]) -> Optional[str]:
+    if not content or not content.parts:
+        return None
+    return "".join(part.text for part in content.parts if part.text) or None
+
+
+# Default level of each callback's record
+DEFAULT_LEVELS = {
+    "on_user_message": logging.INFO,
+    "before_run": logging.INFO,
+    "after_run": logging.INFO,
+    "on_event": logging.DEBUG,
+    "before_agent": logging.DEBUG,
+    "after_agent": logging.DEBUG,
+    "before_model": logging.DEBUG,
+    "after_model": logging.INFO,
+    "before_tool": logging.DEBUG,
+    "after_tool": logging.INFO,
+    "on_model_error": logging.ERROR,
+    "on_tool_error": logging.ERROR,
+}
+
+
+class StructuredLoggingPlugin(BasePlugin):
+    """Logs one compact record per ADK callback.
+
+    Records carry ids, names, timings and token counts, not whole requests;
+    text is cut to `preview_chars`. Nothing is built for records that the
+    logger's level or the sampling would drop.
+
+    Args:
+        logger_name: Logger receiving the records.
+        levels: Overrides of DEFAULT_LEVELS, e.g. {"on_event": logging.INFO}.
+        sample_rates: Fraction of each callback's records kept (default 1.0),
+                      e.g. {"on_event": 0.1}. Errors are never sampled out.
+        preview_chars: Characters of text kept in a record.
+    """
+
+    def __init__(
+        self,
+        name: str = "structured_logging",
+        logger_name: str = "adk.callbacks",
+        levels: Optional[dict[str, int]] = None,
+        sample_rates: Optional[dict[str, float]] = None,
+        preview_chars: int = 200,
+    ):
+        super().__init__(name)
+        self.logger = logging.getLogger(logger_name)
+        self.levels = {**DEFAULT_LEVELS, **(levels or {})}
+        self.sample_rates = sample_rates or {}
+        self.preview_chars = preview_chars
+        self._started = {}
+
+    def _enabled(self, callback: str) -> bool:
+        if not self.logger.isEnabledFor(self.levels[callback]):
+            return False
+        rate = self.sample_rates.get(callback, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+    def _log(self, callback: str, **fields):
+        self.logger.log(self.levels[callback], callback, extra={"fields": fields})
+
+    def _start(self, key):
+        self._started[key] = time.perf_counter()
+
+    def _elapsed_ms(self, key) -> Optional[float]:
+        started = self._started.pop(key, None)
+        if started is None:
+            return None
+        return round((time.perf_counter() - started) * 1000, 1)
+
+    async def on_user_message_callback(
+        self, *, invocation_context: InvocationContext, user_message: types.Content
+    ) -> Optional[types.Content]:
+        if self._enabled("on_user_message"):
+            self._log(
+                "on_user_message",
+                invocation_id=invocation_context.invocation_id,
+                session_id=invocation_context.session.id,
+                user_id=invocation_context.user_id,
+                text=_preview(_content_text(user_message), self.preview_chars),
+            )
+        return None
+
+    async def before_run_callback(
+        self, *, invocation_context: InvocationContext
+    ) -> Optional[types.Content]:
+        self._start(("run", invocation_context.invocation_id))
+        if self._enabled("before_run"):
+            self._log(
+                "before_run",
+                invocation_id=invocation_context.invocation_id,
+                agent=invocation_context.agent.name,
+            )
+        return None
+
+    async def on_event_callback(
+        self, *, invocation_context: InvocationContext, event: Event
+    ) -> Optional[Event]:
+        if self._enabled("on_event"):
+            self._log(
+                "on_event",
+                invocation_id=event.invocation_id,
+                event_id=event.id,
+                author=event.author,
+                final=event.is_final_response(),
+                function_calls=[call.name for call in event.get_function_calls()] or None,
+                text=_preview(_content_text(event.content), self.preview_chars),
+            )
+        return None
+
+    async def after_run_callback(self, *, invocation_context: InvocationContext) -> None:
+        duration_ms = self._elapsed_ms(("run", invocation_context.invocation_id))
+        if self._enabled("after_run"):
+            self._log(
+                "after_run",
+                invocation_id=invocation_context.invocation_id,
+                duration_ms=duration_ms,
+            )
+
+    async def before_agent_callback(
+        self, *, agent: BaseAgent, callback_context: CallbackContext
+    ) -> Optional[types.Content]:
+        self._start(("agent", callback_context.invocation_id, agent.name))
+        if self._enabled("before_agent"):
+            self._log(
+                "before_agent", invocation_id=callback_context.invocation_id, agent=agent.name
+            )
+        return None
+
+    async def after_agent_callback(
+        self, *, agent: BaseAgent, callback_context: CallbackContext
+    ) -> Optional[types.Content]:
+        duration_ms = self._elapsed_ms(("agent", callback_context.invocation_id, agent.name))
+        if self._enabled("after_agent"):
+            self._log(
+                "after_agent",
+                invocation_id=callback_context.invocation_id,
+                agent=agent.name,
+                duration_ms=duration_ms,
+            )
+        return None
+
+    async def before_model_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        self._start(("model", callback_context.invocation_id, callback_context.agent_name))
+        if self._enabled("before_model"):
+            self._log(
+                "before_model",
+                invocation_id=callback_context.invocation_id,
+                agent=callback_context.agent_name,
+                model=llm_request.model,
+                contents=len(llm_request.contents),
+                tools=list(llm_request.tools_dict) or None,
+            )
+        return None
+
+    async def after_model_callback(
+        self, *, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        key = ("model", callback_context.invocation_id, callback_context.agent_name)
+        # Streaming calls one after_model per chunk; time the final one
+        duration_ms = None if llm_response.partial else self._elapsed_ms(key)
+        if self._enabled("after_model"):
+            usage = llm_response.usage_metadata
+            self._log(
+                "after_model",
+                invocation_id=callback_context.invocation_id,
+                agent=callback_context.agent_name,
+                duration_ms=duration_ms,
+                partial=llm_response.partial or None,
+                finish_reason=llm_response.finish_reason,
+                error_code=llm_response.error_code,
+                prompt_tokens=usage.prompt_token_count if usage else None,
+                output_tokens=usage.candidates_token_count if usage else None,
+            )
+        return None
+
+    async def on_model_error_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest, error: Exception
+    ) -> Optional[LlmResponse]:
+        self._started.pop(("model", callback_context.invocation_id, callback_context.agent_name), None)
+        if self.logger.isEnabledFor(self.levels["on_model_error"]):
+            self._log(
+                "on_model_error",
+                invocation_id=callback_context.invocation_id,
+                agent=callback_context.agent_name,
+                error=type(error).__name__,
+                message=_preview(str(error), self.preview_chars),
+            )
+        return None
+
+    async def before_tool_callback(
+        self, *, tool: BaseTool, tool_args: dict[str, Any], tool_context: ToolContext
+    ) -> Optional[dict]:
+        self._start(("tool", tool_context.function_call_id))
+        if self._enabled("before_tool"):
+            self._log(
+                "before_tool",
+                invocation_id=tool_context.invocation_id,
+                agent=tool_context.agent_name,
+                tool=tool.name,
+                args=_preview(json.dumps(tool_args, default=str), self.preview_chars),
+            )
+        return None
+
+    async def after_tool_callback(
+        self, *, tool: BaseTool, tool_args: dict[str, Any], tool_context: ToolContext, result: dict
+    ) -> Optional[dict]:
+        duration_ms = self._elapsed_ms(("tool", tool_context.function_call_id))
+        if self._enabled("after_tool"):
+            self._log(
+                "after_tool",
+                invocation_id=tool_context.invocation_id,
+                agent=tool_context.agent_name,
+                tool=tool.name,
+                duration_ms=duration_ms,
+                result=_preview(json.dumps(result, default=str), self.preview_chars),
+            )
+        return None
+
+    async def on_tool_error_callback(
+        self, *, tool: BaseTool, tool_args: dict[str, Any], tool_context: ToolContext, error: Exception
+    ) -> Optional[dict]:
+        self._started.pop(("tool", tool_context.function_call_id), None)
+        if self.logger.isEnabledFor(self.levels["on_tool_error"]):
+            self._log(
+                "on_tool_error",
+                invocation_id=tool_context.invocation_id,
+                agent=tool_context.agent_name,
+                tool=tool.name,
+                error=type(error).__name__,
+                message=_preview(str(error), self.preview_chars),
+            )
+        return None
+
+
+print("✅ Structured logging defined.")
@@ -0,0 +1,249 @@
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.apps.base_events_summarizer import BaseEventsSummarizer
+from google.adk.apps.llm_event_summarizer import LlmEventSummarizer
+from google.adk.events import Event
+from google.adk.flows.llm_flows.contents import _process_compaction_events
+from google.adk.models.llm_request import LlmRequest
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.sessions import Session
+from helper.batched_session_service import BatchedDatabaseSessionService
+from helper.session_events import place_compactions
+from helper.token_estimator import estimate_event_tokens
+from typing import Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Compaction driven by prompt size instead of EventsCompactionConfig's fixed
+# invocation interval. After each run the prompt the next turn would send is
+# estimated locally; above `high_watermark` the oldest whole invocations are
+# summarized in the background until the estimate is back under
+# `low_watermark`. Once the summaries themselves outgrow `summary_budget`,
+# they are rolled up into one and the superseded ones are left out of the
+# prompt, so prompt size stays flat however long the conversation runs.
+
+
+def _compactions(events: list[Event]) -> list[Event]:
+    return [event for event in events if event.actions and event.actions.compaction]
+
+
+def _superseded(compaction_events: list[Event]) -> list[Event]:
+    """Compactions whose range lies inside the range of a later compaction."""
+    superseded = []
+    for i, event in enumerate(compaction_events):
+        compaction = event.actions.compaction
+        for later in compaction_events[i + 1 :]:
+            later_compaction = later.actions.compaction
+            if (
+                later_compaction.start_timestamp <= compaction.start_timestamp
+                and later_compaction.end_timestamp >= compaction.end_timestamp
+            ):
+                superseded.append(event)
+                break
+    return superseded
+
+
+def _content_text(content) -> str:
+    if not content or not content.parts:
+        return ""
+    return "\n".join(part.text for part in content.parts if part.text)
+
+
+def estimate_prompt_tokens(events: list[Event]) -> int:
+    """Estimates the history tokens ADK would send for these session events."""
+    if _compactions(events):
+        events = _process_compaction_events(events)
+    superseded = {event.id for event in _superseded(_compactions(events))}
+    return sum(
+        estimate_event_tokens(event) for event in events if event.id not in superseded
+    )
+
+
+class TokenBudgetCompactionPlugin(BasePlugin):
+    """Compacts a session when its estimated prompt exceeds a token budget.
+
+    Args:
+        high_watermark: Estimated prompt tokens that trigger a compaction.
+        low_watermark: Target estimate once the compaction has been appended.
+        summary_budget: Tokens the summaries may take before they are rolled
+                        up into a single one. Defaults to low_watermark / 2.
+        summarizer: Summarizer for the compacted events. Defaults to an
+                    LlmEventSummarizer on the model of the first LlmAgent in
+                    the agent tree; pass one when there is none.
+
+    Keeping a tail of recent invocations below the low watermark needs a
+    BatchedDatabaseSessionService, which lists each compaction before the
+    tail it keeps when loading a session. With any other session service
+    the compaction is listed after the tail and would hide it, so every
+    uncompacted event is summarized instead.
+    """
+
+    def __init__(
+        self,
+        high_watermark: int = 8000,
+        low_watermark: int = 4000,
+        summary_budget: Optional[int] = None,
+        summarizer: Optional[BaseEventsSummarizer] = None,
+        name: str = "token_budget_compaction",
+    ):
+        if low_watermark >= high_watermark:
+            raise ValueError("low_watermark must be lower than high_watermark")
+        super().__init__(name=name)
+        self.high_watermark = high_watermark
+        self.low_watermark = low_watermark
+        self.summary_budget = summary_budget or low_watermark // 2
+        self.summarizer = summarizer
+
+        self._running = {}  # (app_name, user_id, session_id) -> task
+        self.checks = 0
+        self.compactions = 0
+        self.last_prompt_tokens = {}
+        self._warned_unordered = False
+
+    def _pick_events(self, events: list[Event], summary_tokens: int):
+        # Keep the longest tail of whole invocations that fits the low
+        # watermark next to the summaries; everything older gets compacted.
+        compaction_events = _compactions(events)
+        covered_until = max(
+            (event.actions.compaction.end_timestamp for event in compaction_events),
+            default=0.0,
+        )
+        uncompacted = [
+            event
+            for event in events
+            if event.timestamp > covered_until
+            and not (event.actions and event.actions.compaction)
+        ]
+
+        budget = self.low_watermark - summary_tokens
+        tail_tokens = 0
+        split = len(uncompacted)
+        for i in range(len(uncompacted) - 1, -1, -1):
+            tail_tokens += estimate_event_tokens(uncompacted[i])
+            if tail_tokens > budget:
+                break
+            if i == 0 or uncompacted[i - 1].invocation_id != uncompacted[i].invocation_id:
+                split = i
+        return uncompacted[:split], uncompacted[split:]
+
+    async def _compact(self, session: Session, session_service, llm) -> None:
+        summarizer = self.summarizer or LlmEventSummarizer(llm=llm)
+        compaction_events = _compactions(session.events)
+        superseded = {event.id for event in _superseded(compaction_events)}
+        summaries = [event for event in compaction_events if event.id not in superseded]
+        summary_tokens = sum(estimate_event_tokens(event) for event in summaries)
+
+        events_to_compact, tail = self._pick_events(session.events, summary_tokens)
+        if tail and not isinstance(session_service, BatchedDatabaseSessionService):
+            # See place_compactions(): without it the tail would be hidden
+            # behind the compaction, so compact it as well
+            if not self._warned_unordered:
+                logger.warning(
+                    "%s cannot keep a tail below low_watermark with %s; "
+                    "compacting every uncompacted event",
+                    self.name,
+                    type(session_service).__name__,
+                )
+                self._warned_unordered = True
+            events_to_compact, tail = events_to_compact + tail, []
+        if not events_to_compact:
+            return
+        if summaries and summary_tokens > self.summary_budget:
+            # Roll the summaries up with the new events: the result covers the
+            # whole conversation so far and supersedes every earlier summary
+            events_to_compact = [
+                Event(
+                    author="model",
+                    content=event.actions.compaction.compacted_content,
+                    timestamp=event.actions.compaction.start_timestamp,
+                    invocation_id=event.invocation_id,
+                )
+                for event in summaries
+            ] + events_to_compact
+
+        compaction_event = await summarizer.maybe_summarize_events(
+            events=events_to_compact
+        )
+        if compaction_event:
+            await session_service.append_event(session=session, event=compaction_event)
+            if tail:
+                # Same order the service loads the session in next time
+                session.events[:] = place_compactions(session.events)
+            self.compactions += 1
+
+    @staticmethod
+    def _find_llm(agent: BaseAgent):
+        """Model of the first LlmAgent in the tree (roots may be workflows)."""
+        if isinstance(agent, LlmAgent):
+            return agent.canonical_model
+        for sub_agent in agent.sub_agents:
+            llm = TokenBudgetCompactionPlugin._find_llm(sub_agent)
+            if llm is not None:
+                return llm
+        return None
+
+    async def after_run_callback(self, *, invocation_context: InvocationContext) -> None:
+        session = invocation_context.session
+        key = (session.app_name, session.user_id, session.id)
+        self.checks += 1
+        prompt_tokens = estimate_prompt_tokens(session.events)
+        self.last_prompt_tokens[key] = prompt_tokens
+        if prompt_tokens <= self.high_watermark:
+            return
+        if key in self._running and not self._running[key].done():
+            return
+
+        llm = None
+        if self.summarizer is None:
+            llm = self._find_llm(invocation_context.agent)
+            if llm is None:
+                logger.warning(
+                    "%s: no LlmAgent under %s to summarize with; pass a summarizer",
+                    self.name,
+                    invocation_context.agent.name,
+                )
+                return
+
+        # Summarize off the request path, like the Runner's own compaction
+        task = asyncio.create_task(
+            self._compact(session, invocation_context.session_service, llm)
+        )
+        self._running[key] = task
+        task.add_done_callback(lambda _: self._running.pop(key, None))
+
+    async def before_model_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> None:
+        # ADK puts every compaction in the prompt; drop rolled-up ones. A
+        # content is dropped when it is the compacted Content itself or, since
+        # ADK copies it and may reword it as another author's message, when
+        # its whole text is exactly the summary in one of those forms. A
+        # message merely quoting a summary is kept.
+        superseded = _superseded(_compactions(callback_context.session.events))
+        if not superseded:
+            return None
+        compacted = [event.actions.compaction.compacted_content for event in superseded]
+        compacted_ids = {id(content) for content in compacted}
+        texts = set()
+        for content in compacted:
+            summary = _content_text(content)
+            if summary:
+                texts.add(summary)
+                texts.add(f"For context:\n[model] said: {summary}")
+        llm_request.contents = [
+            content
+            for content in llm_request.contents
+            if id(content) not in compacted_ids and _content_text(content) not in texts
+        ]
+        return None
+
+    async def wait_idle(self) -> None:
+        """Waits for background compactions (e.g. before the event loop ends)."""
+        await asyncio.gather(*list(self._running.values()), return_exceptions=True)
+
+
+print("✅ Token-budget compaction plugin defined.")
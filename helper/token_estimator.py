@@ -0,0 +1,84 @@
+from google.adk.events import Event
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+from typing import Optional
+import json
+import re
+
+
+# Local prompt size estimates, so budget checks never need a count_tokens
+# API call. Words are charged about one token per 4 characters (at least one
+# per word) and punctuation one token each, which tracks Gemini's tokenizer
+# more closely than a flat characters / 4 on code, JSON and short words.
+
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+# Gemini counts an image, or a PDF page, as 258 tokens
+INLINE_DATA_TOKENS = 258
+
+_event_cache = {}
+_EVENT_CACHE_SIZE = 10000
+
+
+def estimate_text_tokens(text: Optional[str]) -> int:
+    """Estimates the number of tokens in a piece of text."""
+    if not text:
+        return 0
+    tokens = 0
+    for piece in _PIECES.findall(text):
+        tokens += (len(piece) + 3) // 4
+    return max(1, tokens)
+
+
+def estimate_content_tokens(content: Optional[types.Content]) -> int:
+    """Estimates the tokens of a Content: text, function calls and responses."""
+    if not content or not content.parts:
+        return 0
+    tokens = 0
+    for part in content.parts:
+        if part.text:
+            tokens += estimate_text_tokens(part.text)
+        if part.function_call:
+            tokens += estimate_text_tokens(part.function_call.name)
+            tokens += estimate_text_tokens(json.dumps(part.function_call.args or {}))
+        if part.function_response:
+            tokens += estimate_text_tokens(part.function_response.name)
+            tokens += estimate_text_tokens(
+                json.dumps(part.function_response.response or {}, default=str)
+            )
+        if part.inline_data or part.file_data:
+            tokens += INLINE_DATA_TOKENS
+    return tokens
+
+
+def estimate_event_tokens(event: Event) -> int:
+    """estimate_content_tokens() for an event, cached by event id."""
+    if event.actions and event.actions.compaction:
+        return estimate_content_tokens(event.actions.compaction.compacted_content)
+    tokens = _event_cache.get(event.id)
+    if tokens is None:
+        tokens = estimate_content_tokens(event.content)
+        if len(_event_cache) >= _EVENT_CACHE_SIZE:
+            _event_cache.clear()
+        _event_cache[event.id] = tokens
+    return tokens
+
+
+def estimate_request_tokens(llm_request: LlmRequest) -> int:
+    """Estimates the prompt tokens of a request (instruction, tools, contents)."""
+    tokens = 0
+    config = llm_request.config
+    if config and config.system_instruction:
+        tokens += estimate_text_tokens(str(config.system_instruction))
+    if config and config.tools:
+        for tool in config.tools:
+            for declaration in getattr(tool, "function_declarations", None) or []:
+                tokens += estimate_text_tokens(
+                    declaration.model_dump_json(exclude_none=True)
+                )
+    for content in llm_request.contents:
+        tokens += estimate_content_tokens(content)
+    return max(1, tokens)
+
+
+print("✅ Token estimator defined.")
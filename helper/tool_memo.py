@@ -0,0 +1,198 @@
+from google.adk.tools.function_tool import FunctionTool
+from google.adk.tools.tool_context import ToolContext
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+import asyncio
+import copy
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+# Memoization of pure (or near-pure) function tools.
+#
+# The model often calls the same tool with the same arguments several times
+# in a session, e.g. once per LoopAgent refinement cycle. MemoizedFunctionTool
+# answers such repeats from an in-process LRU cache instead of running the
+# function again. A call is never cached, and never answered from the cache,
+# when it asks for or resumes from a human confirmation, or writes state.
+# Tools with side effects (placing an order, sending a message) must not be
+# wrapped: two identical real requests would collapse into one.
+
+SCOPES = ("invocation", "session", "app")
+
+# Every memoized tool registers its stats here, see memo_metrics()
+_registry = []
+
+
+class MemoizedFunctionTool(FunctionTool):
+    """FunctionTool that reuses results of identical calls.
+
+    Args:
+        func: The tool function.
+        scope: Who shares cached results. "invocation": calls within one
+               run of the agent; "session": calls within one session;
+               "app": every session of the app (only for pure functions).
+        ttl: Seconds a result stays valid. None keeps it until evicted.
+        max_entries: LRU bound on the number of cached results.
+        should_cache: Optional predicate on the result; only results it
+                      accepts are cached (e.g. only successful lookups).
+    """
+
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        *,
+        scope: str = "session",
+        ttl: Optional[float] = None,
+        max_entries: int = 1024,
+        should_cache: Optional[Callable[[Any], bool]] = None,
+        **kwargs,
+    ):
+        super().__init__(func, **kwargs)
+        if scope not in SCOPES:
+            raise ValueError(f"scope must be one of {SCOPES}, got {scope!r}")
+        self.scope = scope
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.should_cache = should_cache
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "in_flight_hits": 0,
+            "not_cached": 0,
+            "expired": 0,
+            "evicted": 0,
+        }
+        _registry.append(self)
+
+    def _cache_key(self, args: dict[str, Any], tool_context: ToolContext) -> str:
+        session = tool_context.session
+        if self.scope == "invocation":
+            scope_key = [session.app_name, tool_context.invocation_id]
+        elif self.scope == "session":
+            scope_key = [session.app_name, session.user_id, session.id]
+        else:
+            scope_key = [session.app_name]
+        return json.dumps([scope_key, args], sort_keys=True, default=str)
+
+    def _lookup(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._entries[key]
+            self.stats["expired"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: str, result: Any):
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        self._entries[key] = (expires_at, copy.deepcopy(result))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evicted"] += 1
+
+    async def run_async(self, *, args: dict[str, Any], tool_context: ToolContext) -> Any:
+        # A resumed confirmation must reach the function itself
+        if tool_context.tool_confirmation is not None:
+            self.stats["not_cached"] += 1
+            return await super().run_async(args=args, tool_context=tool_context)
+
+        key = self._cache_key(args, tool_context)
+        entry = self._lookup(key)
+        if entry is not None:
+            self.stats["hits"] += 1
+            logger.debug("Tool cache hit: %s(%s)", self.name, args)
+            return copy.deepcopy(entry[1])
+
+        # Identical calls issued in parallel share one execution
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self.stats["in_flight_hits"] += 1
+            return copy.deepcopy(await asyncio.shield(pending))
+
+        self.stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            state_keys = len(tool_context.actions.state_delta)
+            result = await super().run_async(args=args, tool_context=tool_context)
+            side_effects = (
+                tool_context.function_call_id in tool_context.actions.requested_tool_confirmations
+                or len(tool_context.actions.state_delta) != state_keys
+            )
+            if side_effects or (self.should_cache and not self.should_cache(result)):
+                self.stats["not_cached"] += 1
+            else:
+                self._store(key, result)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; don't warn about an unretrieved error
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    def clear(self):
+        """Drops every cached result."""
+        self._entries.clear()
+
+
+def memoize_tool(
+    func: Optional[Callable[..., Any]] = None,
+    *,
+    scope: str = "session",
+    ttl: Optional[float] = None,
+    max_entries: int = 1024,
+    should_cache: Optional[Callable[[Any], bool]] = None,
+):
+    """Wraps a tool function in a MemoizedFunctionTool.
+
+    Usable as @memoize_tool, @memoize_tool(scope="app", ttl=60) or
+    memoize_tool(func, ...). The decorated name becomes the tool object,
+    so list it directly in the agent's tools.
+    """
+
+    def wrap(f):
+        return MemoizedFunctionTool(
+            f, scope=scope, ttl=ttl, max_entries=max_entries, should_cache=should_cache
+        )
+
+    return wrap(func) if func is not None else wrap
+
+
+def memo_metrics() -> dict:
+    """Cache counters of every memoized tool, keyed by tool name."""
+    metrics = {}
+    for tool in _registry:
+        lookups = tool.stats["hits"] + tool.stats["in_flight_hits"] + tool.stats["misses"]
+        metrics[tool.name] = {
+            **tool.stats,
+            "entries": len(tool._entries),
+            "hit_rate": (lookups - tool.stats["misses"]) / lookups if lookups else 0.0,
+        }
+    return metrics
+
+
+def print_memo_metrics():
+    """Prints the cache counters of every memoized tool."""
+    for name, metrics in memo_metrics().items():
+        print(
+            f"🗃️  {name}: {metrics['hits'] + metrics['in_flight_hits']} hits,"
+            f" {metrics['misses']} misses ({metrics['hit_rate']:.0%}),"
+            f" {metrics['entries']} cached, {metrics['evicted']} evicted,"
+            f" {metrics['expired']} expired, {metrics['not_cached']} not cached"
+        )
+
+
+print("✅ Tool memoization defined.")